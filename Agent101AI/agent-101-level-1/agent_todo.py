@@ -9,6 +9,11 @@ DB_PATH = "todos.db"
 client = OpenAI()   # reads OPENAI_API_KEY
 
 # ====== Helpers ======
+# Case-insensitive patterns, so neither helper has to lower() the message.
+# Longest prefixes first so "add task buy milk" doesn't leave "task buy milk".
+_PREFIX_RE = re.compile(r"^\s*(?:add task|please add|new task|create|add)\s+", re.IGNORECASE)
+_TASK_ID_RE = re.compile(r"\btask\s+(\d+)\b", re.IGNORECASE)
+
 def _parse_args(a):
     """Responses API sometimes returns tool args as JSON string; sometimes a dict."""
     if a is None:
@@ -31,11 +36,7 @@ def _extract_title(args: Dict[str, Any], user_message: str) -> str:
     )
     if title:
         return str(title).strip()
-    cleaned = user_message.strip()
-    for prefix in ("add ", "create ", "new task ", "please add ", "add task "):
-        if cleaned.lower().startswith(prefix):
-            cleaned = cleaned[len(prefix):]
-            break
+    cleaned = _PREFIX_RE.sub("", user_message, count=1).strip()
     return cleaned or "untitled task"
 
 def _extract_task_id(args: Dict[str, Any], user_message: str) -> Optional[int]:
@@ -46,7 +47,7 @@ def _extract_task_id(args: Dict[str, Any], user_message: str) -> Optional[int]:
             return int(task_id)
         except (TypeError, ValueError):
             pass
-    m = re.search(r"\btask\s+(\d+)\b", user_message.lower())
+    m = _TASK_ID_RE.search(user_message)
     if m:
         return int(m.group(1))
     return None
@@ -1,31 +1,82 @@
-import os, sqlite3, json, re
-from typing import Dict, Any, List, Optional
-from openai import OpenAI
+import os, sqlite3, json, re, threading, atexit, asyncio
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from openai import AsyncOpenAI
+
+# orjson is optional: faster tool-arg parsing when installed, stdlib json otherwise.
+try:
+    import orjson
+    _loads = orjson.loads  # its JSONDecodeError subclasses json.JSONDecodeError
+
+    def _dumps(o: Any) -> str:
+        return orjson.dumps(o).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(o: Any) -> str:
+        return json.dumps(o, ensure_ascii=False)
 
 # ====== NEW: date parsing ======
-import pytz
 import dateparser
 from dateparser.search import search_dates
-from datetime import datetime
+from datetime import datetime, date, time, timedelta
+from zoneinfo import ZoneInfo
 
 # ====== Config ======
 # Use your local timezone; change if needed.
 LOCAL_TZ_NAME = os.getenv("AGENT_TIMEZONE", "America/Denver")
-LOCAL_TZ = pytz.timezone(LOCAL_TZ_NAME)
+LOCAL_TZ = ZoneInfo(LOCAL_TZ_NAME)
 
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")  # change if needed
 DB_PATH = "todos.db"
 
-client = OpenAI()   # reads OPENAI_API_KEY
+client = AsyncOpenAI()   # reads OPENAI_API_KEY
+
+# One reusable English parser instead of dateparser's functional API, which rebuilds its
+# language/locale state on every call.
+_DATEPARSER_SETTINGS = {
+    "TIMEZONE": LOCAL_TZ_NAME,
+    "RETURN_AS_TIMEZONE_AWARE": True,
+    "PREFER_DATES_FROM": "future",  # 'this Friday' -> future Friday
+}
+_DATE_PARSER = dateparser.DateDataParser(languages=["en"], settings=_DATEPARSER_SETTINGS)
+
+def _warm_dateparser():
+    try:
+        _DATE_PARSER.get_date_data("tomorrow 5pm")
+        search_dates("buy milk tomorrow 5pm", languages=["en"], settings=_DATEPARSER_SETTINGS)
+    except Exception:
+        pass
 
 # ====== Helpers ======
+# Everything the tools fall back to from the raw message, in one alternation and one scan:
+# the command prefix to strip for a title (longest first, so "add task buy milk" doesn't leave
+# "task buy milk"), and a 'task <id>' reference.
+_MESSAGE_RE = re.compile(
+    r"(?P<prefix>^\s*(?:add task|please add|new task|create|add)\s+)|\btask\s+(?P<id>\d+)\b",
+    re.IGNORECASE,
+)
+
+@lru_cache(maxsize=64)
+def _message_fallbacks(user_message: str) -> Tuple[str, Optional[int]]:
+    """(title with command prefix stripped, first 'task N' id) for a user message."""
+    title_start, task_id = 0, None
+    for m in _MESSAGE_RE.finditer(user_message):
+        if m.group("prefix"):
+            title_start = m.end()
+        elif task_id is None:
+            task_id = int(m.group("id"))
+            break
+    return user_message[title_start:].strip(), task_id
+
 def _parse_args(a):
     """Responses API sometimes returns tool args as JSON string; sometimes a dict."""
     if a is None:
         return {}
     if isinstance(a, str):
         try:
-            return json.loads(a)
+            return _loads(a)
         except json.JSONDecodeError:
             return {"value": a}
     return a  # already a dict
@@ -41,12 +92,19 @@ def _extract_title(args: Dict[str, Any], user_message: str) -> str:
     )
     if title:
         return str(title).strip()
-    cleaned = user_message.strip()
-    for prefix in ("add ", "create ", "new task ", "please add ", "add task "):
-        if cleaned.lower().startswith(prefix):
-            cleaned = cleaned[len(prefix):]
-            break
-    return cleaned or "untitled task"
+    return _message_fallbacks(user_message)[0] or "untitled task"
+
+def _add_task_params(args: Dict[str, Any], user_message: str) -> Tuple[str, Optional[str]]:
+    """(title, due_text) for one add_task call."""
+    title = _extract_title(args, user_message)
+    due_text = args.get("due")
+
+    # Level-2 robustness: if model didn't pass 'due', try to extract it from title
+    if not due_text:
+        title, possible_due = _split_title_and_due_from_title(title)
+        if possible_due:
+            due_text = possible_due
+    return title, due_text
 
 def _extract_task_id(args: Dict[str, Any], user_message: str) -> Optional[int]:
     """Accept task_id/id or infer from text like 'complete task 3'."""
@@ -56,19 +114,101 @@ def _extract_task_id(args: Dict[str, Any], user_message: str) -> Optional[int]:
             return int(task_id)
         except (TypeError, ValueError):
             pass
-    m = re.search(r"\btask\s+(\d+)\b", user_message.lower())
-    if m:
-        return int(m.group(1))
-    return None
+    return _message_fallbacks(user_message)[1]
 
+_WDAY = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MON = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 def _humanize_iso(iso_str: str) -> str:
     """Turn ISO string into a friendly local time, e.g. 'Tue, Oct 21 5:00 PM'."""
+    # Fast path: a naive string, or one whose offset is the one LOCAL_TZ has on that date
+    # (what _parse_natural_due stores), is already local wall time. Skip the tz conversion and
+    # strftime; format from the table lookups instead.
+    if len(iso_str) >= 16:
+        try:
+            dt = datetime.fromisoformat(iso_str[:16])
+        except ValueError:
+            pass
+        else:
+            has_offset = iso_str.endswith("Z") or iso_str[-6] in "+-"
+            if not has_offset or iso_str[-6:] == dt.replace(tzinfo=LOCAL_TZ).isoformat()[-6:]:
+                h = dt.hour
+                ampm = "PM" if h >= 12 else "AM"
+                return (f"{_WDAY[dt.weekday()]}, {_MON[dt.month - 1]} {dt.day:02d} "
+                        f"{(h % 12) or 12:02d}:{dt.minute:02d} {ampm}")
     dt = datetime.fromisoformat(iso_str)
     if dt.tzinfo is None:
-        dt = LOCAL_TZ.localize(dt)
+        dt = dt.replace(tzinfo=LOCAL_TZ)
     local_dt = dt.astimezone(LOCAL_TZ)
     return local_dt.strftime("%a, %b %d %I:%M %p")
 
+# ====== Fast-path due parsing ======
+# dateparser is slow (locale/language machinery on every call). The phrases this agent
+# sees most are handled by one precompiled alternation: a single scan finds the date form
+# (named group says which) plus an optional trailing time. Anything else falls through.
+_DUE_RE = re.compile(
+    r"\b(?:(?P<iso>\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?)"
+    r"|(?P<rel>today|tonight|tomorrow|tmrw)"
+    r"|(?:(?:this|next)\s+)?(?P<wd>mon(?:day)?|tue(?:s|sday)?|wed(?:nesday)?"
+    r"|thu(?:rs?|rsday)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)"
+    r"|(?P<mon>\d{1,2})/(?P<day>\d{1,2})(?:/(?P<year>\d{4}|\d{2}))?)\b"
+    r"(?:\s+(?:at\s+)?(?:(?P<h1>\d{1,2}):(?P<mi>\d{2})\s*(?P<ap1>am|pm)?"
+    r"|(?P<h2>\d{1,2})\s*(?P<ap2>am|pm)))?",
+    re.IGNORECASE,
+)
+_WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+def _time_of(g: Dict[str, Optional[str]]) -> Optional[tuple]:
+    """(hour, minute, has_meridiem) from a pattern's time groups; raises ValueError if invalid."""
+    h = g.get("h1") or g.get("h2")
+    if h is None:
+        return None
+    hour, minute = int(h), int(g.get("mi") or 0)
+    ampm = (g.get("ap1") or g.get("ap2") or "").lower()
+    if ampm:
+        if not 1 <= hour <= 12:
+            raise ValueError("hour out of range")
+        hour = hour % 12 + (12 if ampm == "pm" else 0)
+    if hour > 23 or minute > 59:
+        raise ValueError("time out of range")
+    return hour, minute, bool(ampm)
+
+def _fast_due(m: "re.Match", now_local: datetime) -> Optional[datetime]:
+    """Build a tz-aware datetime from a _DUE_RE match, or None if it isn't a real date."""
+    g = m.groupdict()
+    today = now_local.date()
+    try:
+        hm = _time_of(g)
+        if g.get("iso"):
+            dt = datetime.fromisoformat(g["iso"].upper())
+            if hm and len(g["iso"]) == 10:  # '2025-11-02 5pm'
+                dt = dt.replace(hour=hm[0], minute=hm[1])
+            return dt.replace(tzinfo=LOCAL_TZ)
+        if g.get("rel"):
+            rel = g["rel"].lower()
+            day = today + timedelta(days=1 if rel in ("tomorrow", "tmrw") else 0)
+            if rel == "tonight":
+                if hm is None:
+                    hm = (20, 0, False)
+                elif not hm[2] and hm[0] < 12:
+                    hm = (hm[0] + 12, hm[1], False)
+            if hm is None:
+                # Same as dateparser: a bare 'today'/'tomorrow' keeps the current time of day.
+                return now_local + (day - today)  # wall-clock arithmetic under zoneinfo
+        elif g.get("wd"):
+            # Always the upcoming occurrence; 'thursday' said on a Thursday means next week.
+            ahead = (_WEEKDAYS[g["wd"][:3].lower()] - today.weekday()) % 7 or 7
+            day = today + timedelta(days=ahead)
+        else:
+            year = g.get("year")
+            day = date(int(year) + (2000 if len(year) == 2 else 0) if year else today.year,
+                       int(g["mon"]), int(g["day"]))
+            if not year and day < today:
+                day = day.replace(year=day.year + 1)
+    except ValueError:
+        return None
+    hour, minute = (hm[0], hm[1]) if hm else (0, 0)
+    return datetime.combine(day, time(hour, minute), tzinfo=LOCAL_TZ)
+
 def _parse_natural_due(due_text: Optional[str]) -> Optional[str]:
     """
     Parse natural language like 'tomorrow 5pm' into ISO8601 with timezone.
@@ -76,20 +216,28 @@ def _parse_natural_due(due_text: Optional[str]) -> Optional[str]:
     """
     if not due_text:
         return None
-    # Put RELATIVE_BASE into settings (works across dateparser versions)
+    # Bucket 'now' by minute: repeats hit the cache, relative phrases stay correct.
+    minute = datetime.now(LOCAL_TZ).replace(second=0, microsecond=0)
+    return _parse_natural_due_cached(due_text.strip().lower(), minute.isoformat())
+
+@lru_cache(maxsize=512)
+def _parse_natural_due_cached(text: str, _minute: str) -> Optional[str]:
     now_local = datetime.now(LOCAL_TZ)
-    settings = {
-        "TIMEZONE": LOCAL_TZ_NAME,
-        "RETURN_AS_TIMEZONE_AWARE": True,
-        "PREFER_DATES_FROM": "future",  # 'this Friday' -> future Friday
-        "RELATIVE_BASE": now_local,
-    }
-    dt = dateparser.parse(due_text, settings=settings, languages=None)
+    m = _DUE_RE.fullmatch(text)
+    dt = _fast_due(m, now_local) if m else None
+    if dt:
+        return dt.isoformat()
+    try:
+        # Other ISO shapes (offsets, fractions, 'Z'): the C parser, not dateparser.
+        dt = datetime.fromisoformat(text.upper())
+    except ValueError:
+        dt = _DATE_PARSER.get_date_data(text).date_obj
     if not dt:
         return None
     if dt.tzinfo is None:
-        dt = LOCAL_TZ.localize(dt)
-    return dt.isoformat()
+        dt = dt.replace(tzinfo=LOCAL_TZ)
+    # Store every due_at in LOCAL_TZ so list_tasks' ORDER BY due_at (a string sort) stays correct.
+    return dt.astimezone(LOCAL_TZ).isoformat()
 
 def _split_title_and_due_from_title(title: str) -> (str, Optional[str]):
     """
@@ -98,26 +246,33 @@ def _split_title_and_due_from_title(title: str) -> (str, Optional[str]):
     """
     if not title:
         return title, None
+    # Keyed on the exact title (the result slices it), bucketed by hour.
+    hour = datetime.now(LOCAL_TZ).strftime("%Y-%m-%dT%H")
+    return _split_title_and_due_cached(title, hour)
+
+@lru_cache(maxsize=512)
+def _split_title_and_due_cached(title: str, _hour: str) -> (str, Optional[str]):
+    # Fast path: the last real date phrase in the title; its span is what gets cut out.
+    now_local = datetime.now(LOCAL_TZ)
+    for m in reversed(list(_DUE_RE.finditer(title))):
+        if _fast_due(m, now_local):
+            start, end = m.span()
+            new_title = (title[:start] + title[end:]).strip(" ,.-")
+            return new_title or title, title[start:end]
 
     # Older dateparser builds don't accept RELATIVE_BASE for search_dates; omit it.
-    found = search_dates(
-        title,
-        settings={
-            "TIMEZONE": LOCAL_TZ_NAME,
-            "RETURN_AS_TIMEZONE_AWARE": True,
-            "PREFER_DATES_FROM": "future",
-        },
-    )
+    found = search_dates(title, languages=["en"], settings=_DATEPARSER_SETTINGS)
     if not found:
         return title, None
 
     # pick the last match (often at the end, most specific)
     matched_text, _ = found[-1]
 
-    # remove matched date text from title (case-insensitive)
-    t_lower = title.lower()
-    m_lower = matched_text.lower()
-    idx = t_lower.rfind(m_lower)
+    # remove matched date text from title; search_dates returns the title's own substring, so
+    # an exact rfind normally hits and the lowered copies are only needed as a fallback
+    idx = title.rfind(matched_text)
+    if idx == -1:
+        idx = title.lower().rfind(matched_text.lower())
     if idx != -1:
         new_title = (title[:idx] + title[idx + len(matched_text):]).strip(" ,.-")
     else:
@@ -128,89 +283,159 @@ def _split_title_and_due_from_title(title: str) -> (str, Optional[str]):
 
     return new_title, matched_text
 
-def _format_list(tasks: List[Dict[str, Any]]) -> str:
+def _due_suffix(t: sqlite3.Row) -> str:
+    # Prefer due_at (parsed datetime) if present; fall back to due text
+    if t["due_at"]:
+        try:
+            return f" (due: {_humanize_iso(t['due_at'])})"
+        except Exception:
+            pass
+    return f" (due: {t['due']})" if t["due"] else ""
+
+def _format_list(tasks: List[sqlite3.Row]) -> str:
     if not tasks:
         return "No open tasks. 🎉"
-    lines = []
-    for t in tasks:
-        parts = [f"#{t['id']} — {t['title']}"]
-        # Prefer due_at (parsed datetime) if present; fall back to due text
-        if t.get("due_at"):
-            try:
-                when = _humanize_iso(t["due_at"])
-                parts.append(f"(due: {when})")
-            except Exception:
-                if t.get("due"):
-                    parts.append(f"(due: {t['due']})")
-        elif t.get("due"):
-            parts.append(f"(due: {t['due']})")
-        if t.get("done"):
-            parts.append("[done]")
-        lines.append(" ".join(parts))
-    return "\n".join(lines)
+    # One join over a generator: no per-row parts list or per-row join.
+    return "\n".join(
+        f"#{t['id']} — {t['title']}{_due_suffix(t)}{' [done]' if t['done'] else ''}" for t in tasks
+    )
 
 # ====== SQLite ======
+# One shared autocommit connection per process instead of connect/commit/close per tool call.
+_CON: Optional[sqlite3.Connection] = None
+# Hot-path SQL as module constants: the same str every call, so sqlite3's statement cache
+# hands back the already-prepared statement instead of re-running sqlite3_prepare.
+_INSERT_SQL = "INSERT INTO tasks(title, due, due_at) VALUES (?, ?, ?)"
+_COMPLETE_SQL = "UPDATE tasks SET done=1 WHERE id=?"
+_DB_LOCK = threading.Lock()
+
+def get_db() -> sqlite3.Connection:
+    global _CON
+    if _CON is None:
+        con = sqlite3.connect(
+            DB_PATH, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: no fsync per commit
+        con.execute("PRAGMA temp_store=MEMORY")
+        con.execute("PRAGMA mmap_size=268435456")
+        con.row_factory = sqlite3.Row  # name access without building a dict per row
+        atexit.register(con.close)
+        _CON = con
+    return _CON
+
+# Bumped whenever init_db's schema changes; stored in SQLite's PRAGMA user_version.
+_SCHEMA_VERSION = 2
+
 def init_db():
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    # Base table (Level 1)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS tasks(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          title TEXT NOT NULL,
-          due TEXT,
-          done INTEGER DEFAULT 0,
-          created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    with _DB_LOCK:
+        con = get_db()
+        # Already migrated: one int read instead of re-running DDL and table_info.
+        if con.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+        # Base table (Level 1)
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS tasks(
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              title TEXT NOT NULL,
+              due TEXT,
+              done INTEGER DEFAULT 0,
+              created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Level 2 migration: add due_at if missing
+        cols = [row[1] for row in con.execute("PRAGMA table_info(tasks)").fetchall()]
+        if "due_at" not in cols:
+            con.execute("ALTER TABLE tasks ADD COLUMN due_at TEXT")
+        # Matches list_tasks' ORDER BY term for term, so listing walks the index without a sort.
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS ix_tasks_open ON tasks(done, due_at IS NULL, due_at, id DESC)"
         )
-    """)
-    # Level 2 migration: add due_at if missing
-    cur.execute("PRAGMA table_info(tasks)")
-    cols = [row[1] for row in cur.fetchall()]
-    if "due_at" not in cols:
-        cur.execute("ALTER TABLE tasks ADD COLUMN due_at TEXT")
-    con.commit()
-    con.close()
+        con.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
 def add_task(title: str, due_text: Optional[str] = None) -> Dict[str, Any]:
     """
     Level 2: parse natural language due into due_at (ISO8601).
     Keep original due_text in 'due' for user transparency.
     """
-    due_at_iso = _parse_natural_due(due_text)
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("INSERT INTO tasks(title, due, due_at) VALUES (?, ?, ?)", (title, due_text, due_at_iso))
-    con.commit()
-    tid = cur.lastrowid
-    con.close()
-    return {"id": tid, "title": title, "due": due_text, "due_at": due_at_iso, "done": False}
-
-def list_tasks(show_done: bool = False) -> List[Dict[str, Any]]:
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    # Order: incomplete first, then earliest due_at, then newest id
-    q = """
-      SELECT id,title,due,done,due_at
-      FROM tasks
-      {where_clause}
-      ORDER BY done,
-               CASE WHEN due_at IS NULL THEN 1 ELSE 0 END,
-               due_at ASC,
-               id DESC
-    """
-    where_clause = "" if show_done else "WHERE done=0"
-    rows = cur.execute(q.format(where_clause=where_clause)).fetchall()
-    con.close()
-    return [{"id": r[0], "title": r[1], "due": r[2], "done": bool(r[3]), "due_at": r[4]} for r in rows]
+    return add_tasks([(title, due_text)])[0]
+
+def add_tasks(items: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+    """Insert (title, due_text) pairs in one transaction: one commit for the whole batch."""
+    rows = [(title, due_text, _parse_natural_due(due_text)) for title, due_text in items]
+    if not rows:
+        return []
+    with _DB_LOCK:
+        con = get_db()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.executemany(_INSERT_SQL, rows)
+            # executemany leaves lastrowid unset; ids are contiguous inside this write transaction.
+            last_id = con.execute("SELECT last_insert_rowid()").fetchone()[0]
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+    first_id = last_id - len(rows) + 1
+    return [
+        {"id": first_id + i, "title": title, "due": due_text, "due_at": due_at_iso, "done": False}
+        for i, (title, due_text, due_at_iso) in enumerate(rows)
+    ]
+
+# Order: incomplete first, then earliest due_at, then newest id (same terms as ix_tasks_open).
+# Capped: nobody reads more than a couple hundred tasks in a terminal.
+_LIST_SQL = """
+  SELECT id,title,due,done,due_at
+  FROM tasks
+  {where_clause}
+  ORDER BY done ASC,
+           (due_at IS NULL) ASC,
+           due_at ASC,
+           id DESC
+  LIMIT 200
+"""
+_LIST_SQL_OPEN = _LIST_SQL.format(where_clause="WHERE done=0")
+_LIST_SQL_ALL = _LIST_SQL.format(where_clause="")
+
+def list_tasks(show_done: bool = False) -> List[sqlite3.Row]:
+    with _DB_LOCK:
+        return get_db().execute(_LIST_SQL_ALL if show_done else _LIST_SQL_OPEN).fetchall()
 
 def complete_task(task_id: int) -> Dict[str, Any]:
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("UPDATE tasks SET done=1 WHERE id=?", (task_id,))
-    con.commit()
-    changed = cur.rowcount
-    con.close()
-    return {"updated": changed}
+    return complete_tasks([task_id])[0]
+
+def complete_tasks(task_ids: List[int]) -> List[Dict[str, Any]]:
+    """Mark several ids done in one transaction, keeping a per-id 'updated' count."""
+    if not task_ids:
+        return []
+    with _DB_LOCK:
+        con = get_db()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            changed = [
+                con.execute(_COMPLETE_SQL, (tid,)).rowcount for tid in task_ids
+            ]
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+    return [{"updated": n} for n in changed]
+
+# ====== Warmup ======
+# Create the schema and load dateparser's locale data in the background once the agent starts
+# (not at import, so importing this module never creates todos.db), so both overlap the first
+# prompt and OpenAI round-trip instead of preceding them. run_agent waits on the schema only
+# right before it touches the DB.
+_WARMUP_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="warmup")
+_DB_READY: Optional["Future"] = None
+
+def _start_warmup() -> "Future":
+    """Submit the warmup jobs on first call; returns the schema future."""
+    global _DB_READY
+    if _DB_READY is None:
+        _DB_READY = _WARMUP_POOL.submit(init_db)
+        _WARMUP_POOL.submit(_warm_dateparser)
+    return _DB_READY
 
 # ====== Tools ======
 TOOLS = [
@@ -268,10 +493,10 @@ You are a helpful To-Do Agent.
 """
 
 # ====== Agent Runner ======
-def _local_summarize(tool_outputs: List[Dict[str, Any]]) -> str:
-    if not tool_outputs:
+def _local_summarize(outputs: List[Any]) -> str:
+    if not outputs:
         return "(no actions taken)"
-    last = tool_outputs[-1]["output"]
+    last = outputs[-1]
     if isinstance(last, dict) and {"id", "title"}.issubset(last.keys()):
         # add_task result
         if last.get("due_at"):
@@ -287,96 +512,191 @@ def _local_summarize(tool_outputs: List[Dict[str, Any]]) -> str:
         return "Marked the task complete." if last["updated"] else "I couldn't find that task id."
     if isinstance(last, list):
         return _format_list(last)
-    return json.dumps(last, ensure_ascii=False)
+    return _dumps(last)
+
+def _jsonable(output: Any) -> Any:
+    """sqlite3.Row isn't JSON-serializable; only the SDK continuation needs plain dicts."""
+    if isinstance(output, list):
+        return [dict(r) if isinstance(r, sqlite3.Row) else r for r in output]
+    return output
+
+# Which SDK we're on is fixed for the process: decide the continuation path once.
+_HAS_SUBMIT = hasattr(client.responses, "submit_tool_outputs")
+
+def _run_tool_group(name: Optional[str], args_list: List[Dict[str, Any]], user_message: str) -> List[Any]:
+    """Execute a run of consecutive same-name tool calls; one result per call, in order."""
+    if name == "add_task":
+        return add_tasks([_add_task_params(args, user_message) for args in args_list])
+    if name == "list_tasks":
+        return [list_tasks(bool(args.get("show_done", False))) for args in args_list]
+    if name == "complete_task":
+        task_ids = [_extract_task_id(args, user_message) for args in args_list]
+        updated = iter(complete_tasks([int(t) for t in task_ids if t is not None]))
+        return [{"error": "missing task_id"} if t is None else next(updated) for t in task_ids]
+    return [{"error": f"unknown tool {name}"} for _ in args_list]
+
+async def _run_group_after(prev: Optional["asyncio.Task"], name: Optional[str],
+                           args_list: List[Dict[str, Any]], user_message: str) -> List[Any]:
+    """Run one tool group on a worker thread once the previous group (or DB init) is done."""
+    if prev is not None:
+        # Wait for the previous group without inheriting its failure: each group is its
+        # own transaction, so one failing must not fail the ones after it.
+        await asyncio.wait([prev])
+    else:
+        await asyncio.wrap_future(_start_warmup())
+    return await asyncio.to_thread(_run_tool_group, name, args_list, user_message)
 
-def _has_submit_tool_outputs() -> bool:
-    return hasattr(client.responses, "submit_tool_outputs")
+async def _collect_groups(group_tasks: List["asyncio.Task"],
+                          sizes: List[int]) -> Tuple[List[Any], List[Any], List[BaseException]]:
+    """
+    Await every dispatched group. Returns (outputs parallel to the calls, with an error
+    entry per call of a failed group; outputs of the groups that succeeded; the errors).
+    """
+    results = await asyncio.gather(*group_tasks, return_exceptions=True)
+    outputs: List[Any] = []
+    done: List[Any] = []
+    errors: List[BaseException] = []
+    for res, n in zip(results, sizes):
+        if isinstance(res, BaseException):
+            errors.append(res)
+            outputs.extend({"error": str(res)} for _ in range(n))
+        else:
+            outputs.extend(res)
+            done.extend(res)
+    return outputs, done, errors
+
+def _with_partial(message: str, done: List[Any]) -> str:
+    """Append what was already written, so a failure never hides committed changes."""
+    if not done:
+        return message
+    return f"{message}\nAlready saved: " + " ".join(_local_summarize([out]) for out in done)
+
+async def run_agent(user_message: str):
+    # 1) Initial call, streamed: each function call is dispatched as soon as its output item
+    # completes, so local tool work overlaps the rest of the model's response.
+    # Consecutive add_task/complete_task calls still run as one batch (one DB transaction);
+    # groups are chained so they execute in the order the model emitted them.
+    r = None
+    calls: List[Any] = []
+    pending: List[Any] = []
+    group_tasks: List["asyncio.Task"] = []
+    group_sizes: List[int] = []
+
+    def dispatch_pending():
+        if not pending:
+            return
+        prev = group_tasks[-1] if group_tasks else None
+        args_list = [_parse_args(item.arguments) for item in pending]
+        group_tasks.append(asyncio.create_task(
+            _run_group_after(prev, pending[0].name, args_list, user_message)))
+        group_sizes.append(len(args_list))
+        pending.clear()
 
-def run_agent(user_message: str):
-    # 1) Initial call: let the model decide which tool(s) to call
     try:
-        r = client.responses.create(
+        stream = await client.responses.create(
             model=MODEL,
             input=[
                 {"role": "system", "content": SYSTEM_INSTRUCTIONS},
                 {"role": "user", "content": user_message}
             ],
-            tools=TOOLS
+            tools=TOOLS,
+            stream=True
         )
+        async for event in stream:
+            if event.type == "response.output_item.done" and event.item.type == "function_call":
+                if pending and pending[0].name != event.item.name:
+                    dispatch_pending()
+                pending.append(event.item)
+                calls.append(event.item)
+            elif event.type in ("response.completed", "response.incomplete", "response.failed"):
+                r = event.response
+        dispatch_pending()
     except Exception as e:
-        print("\nASSISTANT:\n", f"API error during initial call: {e}")
+        api_error: Optional[Exception] = e
+    else:
+        api_error = None
+
+    # 2) Collect local tool results, parallel to `calls`; call_id pairs are built only for submit.
+    # Groups already dispatched may be mid-write on a worker thread and cannot be stopped,
+    # so every group is awaited and whatever was committed is reported, even on failure.
+    outputs, done, errors = await _collect_groups(group_tasks, group_sizes)
+    if api_error is not None:
+        print("\nASSISTANT:\n", _with_partial(f"API error during initial call: {api_error}", done))
         return
-
-    # 2) Execute local tools if the model requested them
-    tool_outputs = []
-    try:
-        for item in getattr(r, "output", []):
-            if getattr(item, "type", None) == "function_call":
-                name = getattr(item, "name", None)
-                args = _parse_args(getattr(item, "arguments", None))
-
-                if name == "add_task":
-                    title = _extract_title(args, user_message)
-                    due_text = args.get("due")
-
-                    # Level-2 robustness: if model didn't pass 'due', try to extract it from title
-                    if not due_text:
-                        title, possible_due = _split_title_and_due_from_title(title)
-                        if possible_due:
-                            due_text = possible_due
-
-                    res = add_task(title, due_text)
-
-                elif name == "list_tasks":
-                    res = list_tasks(bool(args.get("show_done", False)))
-
-                elif name == "complete_task":
-                    task_id = _extract_task_id(args, user_message)
-                    if task_id is None:
-                        res = {"error": "missing task_id"}
-                    else:
-                        res = complete_task(int(task_id))
-                else:
-                    res = {"error": f"unknown tool {name}"}
-
-                tool_outputs.append({"call_id": item.call_id, "output": res})
-    except Exception as e:
-        print("\nASSISTANT:\n", f"Local tool execution error: {e}")
+    if errors:
+        print("\nASSISTANT:\n", _with_partial(f"Local tool execution error: {errors[0]}", done))
         return
 
     # 3) Try to continue with tool outputs via SDK (new) or fall back to local summary (old)
-    if tool_outputs:
-        if _has_submit_tool_outputs():
+    if outputs:
+        if _HAS_SUBMIT:
             try:
-                r = client.responses.submit_tool_outputs(
+                r = await client.responses.submit_tool_outputs(
                     response_id=r.id,
-                    tool_outputs=tool_outputs
+                    tool_outputs=[
+                        {"call_id": item.call_id, "output": _jsonable(out)}
+                        for item, out in zip(calls, outputs)
+                    ]
                 )
                 print("\nASSISTANT:\n", getattr(r, "output_text", "").strip() or "(no text returned)")
                 return
             except Exception as e:
-                print("\nASSISTANT:\n", f"(SDK continuation failed; showing local result) {e}\n" + _local_summarize(tool_outputs))
+                print("\nASSISTANT:\n", f"(SDK continuation failed; showing local result) {e}\n" + _local_summarize(outputs))
                 return
         else:
-            print("\nASSISTANT:\n", _local_summarize(tool_outputs))
+            print("\nASSISTANT:\n", _local_summarize(outputs))
             return
 
     # If no tools were called, just print the model's text
     print("\nASSISTANT:\n", getattr(r, "output_text", "").strip() or "(no text returned)")
 
 # ====== Main ======
-if __name__ == "__main__":
-    init_db()
+async def _ainput(prompt: str) -> str:
+    """
+    input() on a daemon thread the loop never joins: the loop stays free while the prompt
+    is open, and Ctrl-C at the prompt exits at once (to_thread would hang shutdown on it).
+    """
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def settle(line: Optional[str], exc: Optional[BaseException]) -> None:
+        if fut.done():
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(line)
+
+    def read() -> None:
+        try:
+            line, exc = input(prompt), None
+        except BaseException as e:
+            line, exc = None, e
+        try:
+            loop.call_soon_threadsafe(settle, line, exc)
+        except RuntimeError:  # loop already closed (we're exiting)
+            pass
+
+    threading.Thread(target=read, name="prompt", daemon=True).start()
+    return await fut
+
+async def main():
+    # Schema and dateparser warm up in the background (see Warmup); run_agent waits before DB use.
+    _start_warmup()
     print("To-Do Agent (Level 2) ready. Try:")
     print("- add buy milk tomorrow 5pm")
     print("- add dentist appointment next Monday 8am")
     print("- list my tasks")
     print("- complete task 1")
+    # One event loop for the whole session: the async client's connection pool is tied to it.
     while True:
-        try:
-            msg = input("\nYOU: ")
-            if msg.strip().lower() in {"quit", "exit"}:
-                break
-            run_agent(msg)
-        except KeyboardInterrupt:
+        msg = await _ainput("\nYOU: ")
+        if msg.strip().lower() in {"quit", "exit"}:
             break
+        await run_agent(msg)
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, EOFError):
+        pass
@@ -27,30 +27,65 @@ import os
 import re
 import sys
 import json
+import asyncio
 import sqlite3
+import atexit
+import threading
+from collections import deque
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # ----------------------------- OpenAI import ---------------------------- #
 try:
-    from openai import OpenAI  # type: ignore
+    from openai import AsyncOpenAI  # type: ignore
     OPENAI_AVAILABLE = True
 except ModuleNotFoundError:
     OPENAI_AVAILABLE = False
     sys.stderr.write("[WARN] Python package `openai` not found. Install with:\n")
     sys.stderr.write("    pip install --upgrade openai\n")
 
+# orjson is optional: faster tool-output encoding when installed, stdlib json otherwise.
+try:
+    import orjson
+    _loads = orjson.loads  # its JSONDecodeError subclasses json.JSONDecodeError
+
+    def _dumps(o: Any) -> str:
+        return orjson.dumps(o).decode()
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
 DB_PATH = os.environ.get("TODO_DB_PATH", "todos.db")
 # Safe default; can override via env (e.g., gpt-4.1, gpt-4o, etc.)
 MODEL = os.environ.get("AGENT_MODEL", "gpt-4o-mini")
 TZ = timezone.utc  # store timestamps as UTC
+# Conversation items kept verbatim per session; older turns are folded into a summary.
+HISTORY_MAX = int(os.environ.get("AGENT_HISTORY_MAX", "30"))
+_COMPACT_BATCH = 10
 
 # ----------------------------- SQLite layer ----------------------------- #
 
+_local = threading.local()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Per-thread persistent connection (autocommit, WAL), opened on first use."""
+    con = getattr(_local, "con", None)
+    if con is None:
+        con = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        con.executescript(
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; "
+            "PRAGMA busy_timeout=5000; PRAGMA temp_store=MEMORY;"
+        )
+        con.row_factory = sqlite3.Row
+        atexit.register(con.close)
+        _local.con = con
+    return con
+
+
 def init_db() -> None:
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute(
+    _get_conn().execute(
         """
         CREATE TABLE IF NOT EXISTS tasks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -61,60 +96,58 @@ def init_db() -> None:
         )
         """
     )
-    con.commit()
-    con.close()
 
 
 def add_task(title: str, due: Optional[str] = None) -> Dict[str, Any]:
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("INSERT INTO tasks(title, due) VALUES (?, ?)", (title, due))
-    con.commit()
-    tid = cur.lastrowid
-    con.close()
-    return {"id": tid, "title": title, "due": due, "done": False}
+    cur = _get_conn().execute("INSERT INTO tasks(title, due) VALUES (?, ?)", (title, due))
+    return {"id": cur.lastrowid, "title": title, "due": due, "done": False}
 
 
-def list_tasks(show_done: bool = True) -> List[Dict[str, Any]]:
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    if show_done:
-        cur.execute(
-            "SELECT id, title, due, done, created_at FROM tasks "
-            "ORDER BY done, due IS NULL, due, id"
-        )
-    else:
-        cur.execute(
-            "SELECT id, title, due, done, created_at FROM tasks "
-            "WHERE done = 0 ORDER BY due IS NULL, due, id"
-        )
-    rows = cur.fetchall()
-    con.close()
+def add_tasks(rows: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+    """Insert many (title, due) rows in one transaction: one commit instead of one per task."""
+    rows = list(rows)
+    if not rows:
+        return []
+    con = _get_conn()
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        con.executemany("INSERT INTO tasks(title, due) VALUES (?, ?)", rows)
+        last = con.execute("SELECT last_insert_rowid()").fetchone()[0]
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    first = last - len(rows) + 1
     return [
-        {"id": r[0], "title": r[1], "due": r[2], "done": bool(r[3]), "created_at": r[4]}
-        for r in rows
+        {"id": first + i, "title": title, "due": due, "done": False}
+        for i, (title, due) in enumerate(rows)
     ]
 
 
+# SQLite builds the whole result as one JSON array (json1), so Python decodes one
+# string instead of building a dict per row. The subquery fixes the row order.
+_LIST_SQL = (
+    "SELECT json_group_array(json_object("
+    "'id', id, 'title', title, 'due', due, "
+    "'done', json(CASE WHEN done THEN 'true' ELSE 'false' END), 'created_at', created_at)) "
+    "FROM (SELECT * FROM tasks WHERE (?1 OR done = 0) ORDER BY done, due IS NULL, due, id)"
+)
+
+
+def list_tasks(show_done: bool = True) -> List[Dict[str, Any]]:
+    (js,) = _get_conn().execute(_LIST_SQL, (1 if show_done else 0,)).fetchone()
+    return _loads(js) if js else []
+
+
 def complete_task(task_id: int) -> Dict[str, Any]:
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("UPDATE tasks SET done = 1 WHERE id = ?", (task_id,))
-    con.commit()
-    cur.execute(
+    con = _get_conn()
+    con.execute("UPDATE tasks SET done = 1 WHERE id = ?", (task_id,))
+    row = con.execute(
         "SELECT id, title, due, done, created_at FROM tasks WHERE id = ?",
         (task_id,),
-    )
-    row = cur.fetchone()
-    con.close()
+    ).fetchone()
     if row:
-        return {
-            "id": row[0],
-            "title": row[1],
-            "due": row[2],
-            "done": bool(row[3]),
-            "created_at": row[4],
-        }
+        return {**dict(row), "done": bool(row["done"])}
     return {"id": task_id, "updated": True}
 
 # ----------------------- Natural date parsing tool ---------------------- #
@@ -130,10 +163,21 @@ WEEKDAYS = {
     'friday': 4, 'saturday': 5, 'sunday': 6
 }
 
+# Compiled once at import; parse_when runs on every add.
+_RE_TIME = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$")
+_RE_TIME_MIL = re.compile(r"^(\d{2})(\d{2})$")
+_RE_IN = re.compile(r"in\s+(\d+)\s*(minute|minutes|min|hour|hours|day|days|week|weeks)")
+_RE_NEXT_WD = re.compile(r"next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+(.*)$")
+_RE_YMD = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:\s+(\d{1,2})(?::(\d{2}))?)?")
+# Prefix match (no trailing \b) so "monday5pm" keeps working like the old startswith scan.
+_RE_WEEKDAY_PREFIX = re.compile(r"^(monday|tuesday|wednesday|thursday|friday|saturday|sunday)")
+_RE_MD = re.compile(r"(\d{1,2})/(\d{1,2})(?:\s+(\d{1,2}(?::\d{2})?\s*(?:am|pm)?))?")
+
+@lru_cache(maxsize=128)
 def _parse_time_part(t: str) -> Tuple[int, int]:
     t = t.strip().lower()
     # 5pm, 5:30pm, 17:00, 0900
-    m = re.match(r"^(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$", t)
+    m = _RE_TIME.match(t)
     if m:
         hh = int(m.group(1))
         mm = int(m.group(2) or 0)
@@ -144,12 +188,28 @@ def _parse_time_part(t: str) -> Tuple[int, int]:
             elif ampm == 'pm':
                 hh += 12
         return hh, mm
-    m = re.match(r"^(\d{2})(\d{2})$", t)
+    m = _RE_TIME_MIL.match(t)
     if m:
         return int(m.group(1)), int(m.group(2))
     raise ValueError("Unrecognized time format")
 
 
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _format_result(text: str, dt_local: datetime) -> Dict[str, Any]:
+    # Fixed-format f-string: same output as strftime('%a, %b %d at %H:%M %Z'), no locale lookup.
+    # UTC is the default local_tz (tool adapter, tests): skip the no-op conversion.
+    u = dt_local if dt_local.tzinfo is timezone.utc else dt_local.astimezone(timezone.utc)
+    u = u.replace(microsecond=0)
+    pretty = (
+        f"{_DAYS[dt_local.weekday()]}, {_MONTHS[dt_local.month - 1]} {dt_local.day:02d} "
+        f"at {dt_local.hour:02d}:{dt_local.minute:02d} {dt_local.tzname() or ''}"
+    )
+    return {'input': text, 'iso_utc': u.isoformat(), 'pretty': pretty}
+
+
 def _next_weekday(base: datetime, target_wd: int) -> datetime:
     days_ahead = (target_wd - base.weekday()) % 7
     if days_ahead == 0:
@@ -159,11 +219,18 @@ def _next_weekday(base: datetime, target_wd: int) -> datetime:
 
 def parse_when(text: str, now: Optional[datetime] = None, local_tz: timezone = timezone.utc) -> Dict[str, Any]:
     if not now:
-        now = datetime.now(tz=local_tz)
-    s = text.strip().lower()
+        # Minute resolution is plenty for due dates and lets repeated phrases hit the cache.
+        now = datetime.now(tz=local_tz).replace(second=0, microsecond=0)
+    # Aware datetimes compare by instant, so now.tzinfo is part of the key too.
+    # The cached dict is shared: hand back a copy carrying the caller's own text.
+    return {**_parse_when_cached(text.strip().lower(), now, now.tzinfo, local_tz), 'input': text}
+
+
+@lru_cache(maxsize=512)
+def _parse_when_cached(s: str, now: datetime, now_tz: Any, local_tz: timezone) -> Dict[str, Any]:
 
     # Relative phrases
-    m = re.search(r"in\s+(\d+)\s*(minute|minutes|min|hour|hours|day|days|week|weeks)", s)
+    m = _RE_IN.search(s)
     if m:
         qty = int(m.group(1))
         unit = m.group(2)
@@ -174,26 +241,21 @@ def parse_when(text: str, now: Optional[datetime] = None, local_tz: timezone = t
             'week': timedelta(weeks=qty), 'weeks': timedelta(weeks=qty)
         }[unit]
         dt = now + delta
-        return {
-            'input': text,
-            'iso_utc': dt.astimezone(timezone.utc).replace(microsecond=0).isoformat(),
-            'pretty': dt.strftime('%a, %b %d at %H:%M %Z')
-        }
+        return _format_result(s, dt)
 
     # today / tomorrow / weekday names with optional time
-    if s.startswith('today') or s.startswith('tomorrow') or any(s.startswith(w) for w in WEEKDAYS):
+    mwd = _RE_WEEKDAY_PREFIX.match(s)
+    if s.startswith('today') or s.startswith('tomorrow') or mwd:
+        # s is already stripped, so slicing past the keyword + lstrip() is enough
         if s.startswith('today'):
             base = now
-            rest = s.replace('today', '', 1).strip()
+            rest = s[5:].lstrip()
         elif s.startswith('tomorrow'):
             base = now + timedelta(days=1)
-            rest = s.replace('tomorrow', '', 1).strip()
+            rest = s[8:].lstrip()
         else:
-            for w, idx in WEEKDAYS.items():
-                if s.startswith(w):
-                    base = _next_weekday(now, idx)
-                    rest = s.replace(w, '', 1).strip()
-                    break
+            base = _next_weekday(now, WEEKDAYS[mwd.group(1)])
+            rest = s[mwd.end():].lstrip()
         hh, mm = (9, 0)  # default 09:00 if no time
         if rest:
             try:
@@ -201,37 +263,25 @@ def parse_when(text: str, now: Optional[datetime] = None, local_tz: timezone = t
             except Exception:
                 pass
         dt_local = base.replace(hour=hh, minute=mm, second=0, microsecond=0)
-        return {
-            'input': text,
-            'iso_utc': dt_local.astimezone(timezone.utc).replace(microsecond=0).isoformat(),
-            'pretty': dt_local.strftime('%a, %b %d at %H:%M %Z')
-        }
+        return _format_result(s, dt_local)
 
     # next <weekday> <time>
-    m = re.match(r"next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+(.*)$", s)
+    m = _RE_NEXT_WD.match(s)
     if m:
         wd = WEEKDAYS[m.group(1)]
         hh, mm = _parse_time_part(m.group(2))
         dt_local = _next_weekday(now, wd).replace(hour=hh, minute=mm, second=0, microsecond=0)
-        return {
-            'input': text,
-            'iso_utc': dt_local.astimezone(timezone.utc).replace(microsecond=0).isoformat(),
-            'pretty': dt_local.strftime('%a, %b %d at %H:%M %Z')
-        }
+        return _format_result(s, dt_local)
 
     # Absolute: YYYY-MM-DD [HH[:MM]] or MM/DD [HH[:MM][am/pm]]
-    m = re.match(r"(\d{4})-(\d{2})-(\d{2})(?:\s+(\d{1,2})(?::(\d{2}))?)?", s)
+    m = _RE_YMD.match(s)
     if m:
         year, month, day = map(int, m.group(1, 2, 3))
         hh = int(m.group(4) or 9)
         mm = int(m.group(5) or 0)
         dt_local = datetime(year, month, day, hh, mm, tzinfo=local_tz)
-        return {
-            'input': text,
-            'iso_utc': dt_local.astimezone(timezone.utc).replace(microsecond=0).isoformat(),
-            'pretty': dt_local.strftime('%a, %b %d at %H:%M %Z')
-        }
-    m = re.match(r"(\d{1,2})/(\d{1,2})(?:\s+(\d{1,2}(?::\d{2})?\s*(?:am|pm)?))?", s)
+        return _format_result(s, dt_local)
+    m = _RE_MD.match(s)
     if m:
         month, day = map(int, m.group(1, 2))
         year = now.year if (month, day) >= (now.month, now.day) else now.year + 1
@@ -240,11 +290,7 @@ def parse_when(text: str, now: Optional[datetime] = None, local_tz: timezone = t
         if time_part:
             hh, mm = _parse_time_part(time_part)
         dt_local = datetime(year, month, day, hh, mm, tzinfo=local_tz)
-        return {
-            'input': text,
-            'iso_utc': dt_local.astimezone(timezone.utc).replace(microsecond=0).isoformat(),
-            'pretty': dt_local.strftime('%a, %b %d at %H:%M %Z')
-        }
+        return _format_result(s, dt_local)
 
     # Fallback: if only a time like "5pm" was given => today at that time
     try:
@@ -252,25 +298,34 @@ def parse_when(text: str, now: Optional[datetime] = None, local_tz: timezone = t
         dt_local = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
         if dt_local < now:
             dt_local += timedelta(days=1)
-        return {
-            'input': text,
-            'iso_utc': dt_local.astimezone(timezone.utc).replace(microsecond=0).isoformat(),
-            'pretty': dt_local.strftime('%a, %b %d at %H:%M %Z')
-        }
+        return _format_result(s, dt_local)
     except Exception:
         pass
 
     raise ValueError("Could not parse date/time phrase")
 
+def parse_when_batch(texts: List[str], local_tz: timezone = timezone.utc) -> List[Dict[str, Any]]:
+    """Parse several phrases in one tool call; a bad phrase yields an error entry, not a failure."""
+    out = []
+    for t in texts:
+        try:
+            out.append(parse_when(t, local_tz=local_tz))
+        except ValueError as e:
+            out.append({'input': t, 'error': str(e)})
+    return out
+
 # --------------------------- OpenAI orchestration ------------------------ #
 
 SYSTEM_PROMPT = (
     "You are a concise To-Do assistant.\n"
     "- When the user asks to add a task, call add_task with a short title and, if present, a parsed ISO UTC due using parse_when.\n"
+    "- When adding several tasks at once, call add_tasks once with all of them instead of repeated add_task calls.\n"
     "- If the user includes a natural date/time phrase, first call parse_when, then pass its iso_utc to add_task.\n"
+    "- If one message contains several date/time phrases, call parse_when_batch once with all of them instead of parse_when per phrase.\n"
     "- For \"list\" requests, call list_tasks.\n"
     "- For \"complete\" requests, call complete_task with the numeric id.\n"
     "- Prefer tool calls over free-text answers and keep language crisp.\n"
+    "- After tools run, reply in natural language only (never raw JSON); show task lists as short lines.\n"
 )
 
 def build_tools_schema() -> List[Dict[str, Any]]:
@@ -290,6 +345,30 @@ def build_tools_schema() -> List[Dict[str, Any]]:
                 "additionalProperties": False,
             },
         },
+        {
+            "type": "function",
+            "name": "add_tasks",
+            "description": "Create several to-do items at once (single DB transaction).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tasks": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string"},
+                                "due": {"type": ["string", "null"], "description": "ISO 8601 UTC datetime string or null"},
+                            },
+                            "required": ["title"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["tasks"],
+                "additionalProperties": False,
+            },
+        },
         {
             "type": "function",
             "name": "list_tasks",
@@ -316,14 +395,29 @@ def build_tools_schema() -> List[Dict[str, Any]]:
             "description": "Parse a natural-language date/time phrase to ISO UTC.",
             "parameters": {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]},
         },
+        {
+            "type": "function",
+            "name": "parse_when_batch",
+            "description": "Parse several natural-language date/time phrases to ISO UTC in one call (results in input order).",
+            "parameters": {
+                "type": "object",
+                "properties": {"texts": {"type": "array", "items": {"type": "string"}}},
+                "required": ["texts"],
+            },
+        },
     ]
 
+# The schema is constant; build it once and reuse it for every request.
+TOOLS_SCHEMA = build_tools_schema()
+
 # Tool bridge (executes the actual Python when model calls a tool)
 TOOL_MAP = {
     "add_task": lambda **kw: add_task(**kw),
+    "add_tasks": lambda **kw: add_tasks((t["title"], t.get("due")) for t in kw["tasks"]),
     "list_tasks": lambda **kw: list_tasks(**kw) if kw else list_tasks(),
     "complete_task": lambda **kw: complete_task(**kw),
     "parse_when": lambda **kw: parse_when(kw["text"], local_tz=timezone.utc),
+    "parse_when_batch": lambda **kw: parse_when_batch(kw["texts"], local_tz=timezone.utc),
 }
 
 def pretty_print_tasks(tasks: List[Dict[str, Any]]) -> str:
@@ -343,6 +437,22 @@ def _warn_no_api_key():
     if not os.environ.get("OPENAI_API_KEY"):
         sys.stderr.write("[WARN] OPENAI_API_KEY is not set; requests will fail.\n")
 
+_RE_COMPLETE = re.compile(r"(?:complete|finish|done)\s+task\s+(\d+)")
+# Fallback "add" splits off a trailing natural-language when-phrase so
+#   "buy milk tomorrow 5pm" -> title: "buy milk", when: "tomorrow 5pm"
+_RE_WHEN = re.compile(
+    r"("
+    r"(?:today|tomorrow)(?:\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?)?"
+    r"|next\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?"
+    r"|(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?"
+    r"|\d{4}-\d{2}-\d{2}(?:\s+\d{1,2}(?::\d{2})?)?"
+    r"|\d{1,2}/\d{1,2}(?:\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?)?"
+    r"|in\s+\d+\s+(?:minutes?|minute|min|hours?|hour|days?|day|weeks?|week)"
+    r"|\d{1,2}(?::\d{2})?\s*(?:am|pm)"
+    r")\s*$",
+    re.IGNORECASE,
+)
+
 def _local_heuristic_fallback(user_text: str) -> Optional[str]:
     """
     Very small non-LLM fallback so the CLI never feels 'silent'.
@@ -360,7 +470,7 @@ def _local_heuristic_fallback(user_text: str) -> Optional[str]:
         return pretty_print_tasks(tasks)
 
     # complete task N
-    m = re.match(r"(?:complete|finish|done)\s+task\s+(\d+)", s)
+    m = _RE_COMPLETE.match(s)
     if m:
         tid = int(m.group(1))
         complete_task(tid)
@@ -370,23 +480,8 @@ def _local_heuristic_fallback(user_text: str) -> Optional[str]:
     if s.startswith("add "):
         raw = user_text[4:].strip()
 
-        # Try to split off a trailing natural-language when-phrase so
-        #   "buy milk tomorrow 5pm" -> title: "buy milk", when: "tomorrow 5pm"
-        when_pat = re.compile(
-            r"("
-            r"(?:today|tomorrow)(?:\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?)?"
-            r"|next\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?"
-            r"|(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?"
-            r"|\d{4}-\d{2}-\d{2}(?:\s+\d{1,2}(?::\d{2})?)?"
-            r"|\d{1,2}/\d{1,2}(?:\s+\d{1,2}(?::\d{2})?\s*(?:am|pm)?)?"
-            r"|in\s+\d+\s+(?:minutes?|minute|min|hours?|hour|days?|day|weeks?|week)"
-            r"|\d{1,2}(?::\d{2})?\s*(?:am|pm)"
-            r")\s*$",
-            re.IGNORECASE,
-        )
-
         when_str = None
-        m2 = when_pat.search(raw)
+        m2 = _RE_WHEN.search(raw)
         if m2:
             when_str = m2.group(1).strip()
             title = raw[: m2.start()].strip(" ,.-") or raw
@@ -407,7 +502,221 @@ def _local_heuristic_fallback(user_text: str) -> Optional[str]:
 
     return None
 
-def run_cli() -> None:
+async def _run_tool_call(tc) -> Any:
+    fn = TOOL_MAP[tc.function.name]
+    args = _loads(tc.function.arguments or "{}")
+    return await asyncio.to_thread(fn, **args)
+
+async def _create(client: Any, on_delta: Optional[Callable[[str], None]], **kwargs) -> Any:
+    """responses.create; with on_delta, stream and forward text deltas as they arrive."""
+    if on_delta is None:
+        return await client.responses.create(**kwargs)
+    final = None
+    stream = await client.responses.create(stream=True, **kwargs)
+    async for event in stream:
+        if event.type == "response.output_text.delta":
+            on_delta(event.delta)
+        elif event.type in ("response.completed", "response.incomplete", "response.failed"):
+            final = event.response
+    if final is None:
+        raise RuntimeError("stream ended without a final response")
+    return final
+
+def new_session() -> Dict[str, Any]:
+    """Per-user conversation state; one AsyncOpenAI client can serve many sessions."""
+    # Unbounded on purpose: compaction enforces HISTORY_MAX, so nothing is dropped unsummarized.
+    return {"history": deque(), "summary": None, "compacting": None}
+
+def _payload(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    head = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if state["summary"]:
+        head.append({"role": "system", "content": "Summary of the earlier conversation: " + state["summary"]})
+    return head + list(state["history"])
+
+async def _summarize(client: Any, previous: Optional[str], items: List[Dict[str, Any]]) -> Optional[str]:
+    transcript = "\n".join(f"{m.get('role')}: {m.get('content')}" for m in items)
+    if previous:
+        transcript = f"Earlier summary: {previous}\n{transcript}"
+    try:
+        resp = await client.responses.create(
+            model=MODEL,
+            input=[
+                {"role": "system", "content": "Summarize this to-do assistant conversation in at most 5 short lines. "
+                                              "Keep task titles, ids and due dates; drop chit-chat."},
+                {"role": "user", "content": transcript},
+            ],
+        )
+        return (resp.output_text or "").strip() or previous
+    except Exception as e:
+        sys.stderr.write(f"[WARN] history summary failed: {e}\n")
+        return previous
+
+def _start_compaction(client: Any, state: Dict[str, Any]) -> None:
+    """
+    Move the oldest turns out of the history (at least _COMPACT_BATCH items and enough to
+    get back under the cap after a tool-heavy turn, stopping at a user-message boundary so
+    tool outputs stay with their calls) and summarize them in the background; the next
+    turn waits for the summary before building its payload. The latest turn always stays,
+    even when it alone is over the cap.
+    """
+    history = state["history"]
+    keep = HISTORY_MAX - _COMPACT_BATCH
+    last_turn = max((i for i, m in enumerate(history) if m.get("role") == "user"), default=0)
+    old: List[Dict[str, Any]] = []
+    while len(old) < last_turn and (len(old) < _COMPACT_BATCH or len(history) > keep
+                                    or history[0].get("role") != "user"):
+        old.append(history.popleft())
+    if not old:
+        return
+    state["compacting"] = asyncio.ensure_future(_summarize(client, state["summary"], old))
+
+async def handle_turn(client: Any, state: Dict[str, Any], user: str,
+                      on_delta: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """
+    Run one user turn and return the assistant's reply (None if there is nothing to show).
+    Only awaits network and worker threads, so turns for different sessions can be in
+    flight together, e.g. from an async web handler, while the CLI drives one at a time.
+    With on_delta, model text is streamed through it as it is decoded and is not returned
+    again; only local fallback replies are.
+    """
+    if state["compacting"] is not None:
+        state["summary"] = await state["compacting"]
+        state["compacting"] = None
+    try:
+        return await _handle_turn(client, state, user, on_delta)
+    finally:
+        # Compact off the critical path: the summary call overlaps the user's next prompt.
+        if len(state["history"]) > HISTORY_MAX - _COMPACT_BATCH:
+            _start_compaction(client, state)
+
+async def _handle_turn(client: Any, state: Dict[str, Any], user: str,
+                       on_delta: Optional[Callable[[str], None]]) -> Optional[str]:
+    history = state["history"]
+    history.append({"role": "user", "content": user})
+
+    # First Responses API call
+    try:
+        resp = await _create(
+            client, on_delta,
+            model=MODEL,
+            input=_payload(state),
+            tools=TOOLS_SCHEMA,
+        )
+    except Exception as e:
+        sys.stderr.write(f"[ERROR] initial call failed: {e}\n")
+        fb = _local_heuristic_fallback(user)
+        if fb is None:
+            sys.stderr.write("[HINT] Try: set AGENT_MODEL=gpt-4o-mini\n")
+        return fb
+
+    # Handle tool calls & follow-up
+    assistant_msgs: List[Dict[str, Any]] = []
+    calls: List[Any] = []
+
+    for item in (resp.output or []):
+        if item.type == "message":
+            assistant_msgs.append({
+                "role": item.message.role,
+                "content": [c.model_dump() for c in (item.message.content or [])],
+                **({"tool_calls": [tc.model_dump() for tc in item.message.tool_calls]} if item.message.tool_calls else {})
+            })
+            calls.extend(item.message.tool_calls or [])
+
+    # Calls from one response are independent: run them concurrently on worker
+    # threads (SQLite + parsing block), so latency is the slowest call, not the sum.
+    results = await asyncio.gather(*(_run_tool_call(tc) for tc in calls), return_exceptions=True)
+    # Decoded payloads stay parallel to `calls`; only the JSON strings go upstream.
+    payloads = [{"error": str(r)} if isinstance(r, Exception) else r for r in results]
+    tool_outputs: List[Dict[str, Any]] = [
+        {
+            "role": "tool",
+            "tool_call_id": tc.id,
+            "name": tc.function.name,
+            "content": _dumps(payload),
+        }
+        for tc, payload in zip(calls, payloads)
+    ]
+
+    if not tool_outputs:
+        final_text = resp.output_text or ""
+        if final_text.strip():
+            return None if on_delta else final_text
+        # No model text, no tools — local heuristic so CLI is never silent
+        fb = _local_heuristic_fallback(user)
+        if fb is None:
+            sys.stderr.write("[WARN] Model returned no content. Try a different model:\n")
+            sys.stderr.write("       set AGENT_MODEL=gpt-4o-mini\n")
+        return fb
+
+    history.extend(assistant_msgs)
+    history.extend(tool_outputs)
+
+    # Follow-up call MUST include tools again; ask for plain text so the reply prints as-is
+    try:
+        follow = await _create(
+            client, on_delta,
+            model=MODEL,
+            input=_payload(state),
+            tools=TOOLS_SCHEMA,
+            text={"format": {"type": "text"}},
+        )
+        final_text = follow.output_text or ""
+    except Exception as e:
+        final_text = ""
+        sys.stderr.write(f"[ERROR] follow-up call failed: {e}\n")
+
+    # Fallbacks if the model gave no text (A+B behavior)
+    if not final_text.strip():
+        by_name: Dict[str, List[Any]] = {}
+        for tc, payload in zip(calls, payloads):
+            by_name.setdefault(tc.function.name, []).append(payload)
+
+        def ok(name: str) -> bool:
+            return any(isinstance(d, dict) and not d.get("error") for d in by_name.get(name, ()))
+
+        # add_tasks returns the list of created rows (an error dict on failure).
+        if ok("add_task") or any(isinstance(d, list) and d for d in by_name.get("add_tasks", ())):
+            return "Task added ✅"
+        if ok("complete_task"):
+            return "Task completed ✅"
+        lists = [d for d in by_name.get("list_tasks", ()) if isinstance(d, list)]
+        if lists:
+            return pretty_print_tasks(lists[-1])
+
+    if on_delta is not None:
+        return None  # already streamed
+    return final_text or None
+
+async def _ainput(prompt: str) -> str:
+    """
+    input() on a daemon thread the loop never joins: background work such as history
+    compaction keeps running while the prompt is open, and Ctrl-C still exits at once.
+    """
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def settle(line: Optional[str], exc: Optional[BaseException]) -> None:
+        if fut.done():
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(line)
+
+    def read() -> None:
+        try:
+            line, exc = input(prompt), None
+        except BaseException as e:
+            line, exc = None, e
+        try:
+            loop.call_soon_threadsafe(settle, line, exc)
+        except RuntimeError:  # loop already closed (we're exiting)
+            pass
+
+    threading.Thread(target=read, name="prompt", daemon=True).start()
+    return await fut
+
+async def run_cli() -> None:
     # If running tests, skip the agent loop regardless of OpenAI availability
     if len(sys.argv) > 1 and sys.argv[1].lower() == "test":
         run_tests()
@@ -421,7 +730,7 @@ def run_cli() -> None:
         sys.stderr.write("    python agent_todo.py test\n")
         return
 
-    client = OpenAI()
+    client = AsyncOpenAI()
     _warn_no_api_key()
     init_db()
 
@@ -433,12 +742,12 @@ def run_cli() -> None:
         "- complete task 1\n"
     )
 
-    msgs = [{"role": "system", "content": SYSTEM_PROMPT}]
+    state = new_session()
 
     while True:
         try:
-            user = input("YOU: ").strip()
-        except (EOFError, KeyboardInterrupt):
+            user = (await _ainput("YOU: ")).strip()
+        except EOFError:
             print()  # newline
             break
         if not user:
@@ -446,117 +755,22 @@ def run_cli() -> None:
         if user.lower() in {"quit", "exit"}:
             break
 
-        msgs.append({"role": "user", "content": user})
+        # Stream model text as it is decoded: the user sees the first tokens right away
+        streamed = False
 
-        # First Responses API call
-        try:
-            resp = client.responses.create(
-                model=MODEL,
-                input=msgs,
-                tools=build_tools_schema(),
-            )
-        except Exception as e:
-            sys.stderr.write(f"[ERROR] initial call failed: {e}\n")
-            fb = _local_heuristic_fallback(user)
-            if fb is not None:
-                print("\nASSISTANT:\n" + fb + "\n")
-                continue
-            else:
-                sys.stderr.write("[HINT] Try: set AGENT_MODEL=gpt-4o-mini\n")
-                continue
-
-        # Handle tool calls & follow-up
-        tool_outputs: List[Dict[str, Any]] = []
-        assistant_msgs: List[Dict[str, Any]] = []
-
-        for item in (resp.output or []):
-            if item.type == "message":
-                assistant_msgs.append({
-                    "role": item.message.role,
-                    "content": [c.model_dump() for c in (item.message.content or [])],
-                    **({"tool_calls": [tc.model_dump() for tc in item.message.tool_calls]} if item.message.tool_calls else {})
-                })
-
-                if item.message.tool_calls:
-                    for tc in item.message.tool_calls:
-                        name = tc.function.name
-                        args = json.loads(tc.function.arguments or "{}")
-                        try:
-                            result = TOOL_MAP[name](**args)
-                            tool_outputs.append({
-                                "role": "tool",
-                                "tool_call_id": tc.id,
-                                "name": name,
-                                "content": json.dumps(result),
-                            })
-                        except Exception as e:
-                            tool_outputs.append({
-                                "role": "tool",
-                                "tool_call_id": tc.id,
-                                "name": name,
-                                "content": json.dumps({"error": str(e)}),
-                            })
-
-        if tool_outputs:
-            msgs.extend(assistant_msgs)
-            msgs.extend(tool_outputs)
-
-            # Follow-up call MUST include tools again
-            try:
-                follow = client.responses.create(
-                    model=MODEL,
-                    input=msgs,
-                    tools=build_tools_schema(),
-                )
-                final_text = follow.output_text or ""
-            except Exception as e:
-                final_text = ""
-                sys.stderr.write(f"[ERROR] follow-up call failed: {e}\n")
-
-            # Fallbacks if the model gave no text (A+B behavior)
-            if not final_text.strip():
-                try:
-                    last_calls = [t for t in tool_outputs]
-                    if any(t.get("name") == "add_task" and not json.loads(t.get("content","{}")).get("error") for t in last_calls):
-                        final_text = "Task added ✅"
-                    elif any(t.get("name") == "complete_task" and not json.loads(t.get("content","{}")).get("error") for t in last_calls):
-                        final_text = "Task completed ✅"
-                    elif any(t.get("name") == "list_tasks" for t in last_calls):
-                        for t in reversed(last_calls):
-                            if t.get("name") == "list_tasks":
-                                try:
-                                    payload = json.loads(t.get("content","null"))
-                                    if isinstance(payload, list):
-                                        print("\nASSISTANT:\n" + pretty_print_tasks(payload) + "\n")
-                                        final_text = ""
-                                        break
-                                except Exception:
-                                    pass
-                except Exception:
-                    pass
-
-            if final_text:
-                try:
-                    obj = json.loads(final_text)
-                    if isinstance(obj, list):
-                        print("\nASSISTANT:\n" + pretty_print_tasks(obj) + "\n")
-                    else:
-                        print("\nASSISTANT:\n" + final_text + "\n")
-                except Exception:
-                    print("\nASSISTANT:\n" + final_text + "\n")
+        def on_delta(delta: str) -> None:
+            nonlocal streamed
+            if not streamed:
+                sys.stdout.write("\nASSISTANT:\n")
+                streamed = True
+            sys.stdout.write(delta)
+            sys.stdout.flush()
 
-        else:
-            final_text = resp.output_text or ""
-            if final_text.strip():
-                print("\nASSISTANT:\n" + final_text + "\n")
-            else:
-                # No model text, no tools — local heuristic so CLI is never silent
-                fb = _local_heuristic_fallback(user)
-                if fb is not None:
-                    print("\nASSISTANT:\n" + fb + "\n")
-                else:
-                    sys.stderr.write("[WARN] Model returned no content. Try a different model:\n")
-                    sys.stderr.write("       set AGENT_MODEL=gpt-4o-mini\n")
+        reply = await handle_turn(client, state, user, on_delta)
+        if streamed:
+            sys.stdout.write("\n\n")
+        if reply is not None:
+            print("\nASSISTANT:\n" + reply + "\n")
 
 # ------------------------------- Tests ---------------------------------- #
 
@@ -610,7 +824,15 @@ def run_tests() -> None:
     r = parse_when("11:00", now=base, local_tz=timezone.utc)
     _assert_eq("time earlier rolls forward", r["iso_utc"], datetime(2025, 10, 19, 11, 0, tzinfo=timezone.utc).isoformat())
 
+    # Batch parsing keeps input order; unparseable phrases become error entries
+    rs = parse_when_batch(["today 5pm", "gibberish"])
+    _assert_eq("batch ok", rs[0]["iso_utc"][:11], datetime.now(timezone.utc).date().isoformat() + "T")
+    _assert_eq("batch error", "error" in rs[1], True)
+
     print("All tests passed.\n")
 
 if __name__ == "__main__":
-    run_cli()
+    try:
+        asyncio.run(run_cli())
+    except KeyboardInterrupt:
+        print()  # newline
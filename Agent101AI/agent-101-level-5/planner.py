@@ -1,14 +1,66 @@
 import os
+import re
+import json
+import asyncio
 from typing import List, Dict, Optional
 from reflection import add_reflection
 
 # Optional: GPT if available
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ModuleNotFoundError:
     OPENAI_AVAILABLE = False
 
+# Clients are built once and reused so the HTTP connection pool (and its TLS sessions)
+# survives across decompositions. The async one is tied to the event loop it was made on.
+_CLIENT = None
+_ASYNC_CLIENT = None  # (loop, AsyncOpenAI)
+
+
+def _online() -> bool:
+    return OPENAI_AVAILABLE and bool(os.environ.get("OPENAI_API_KEY"))
+
+
+def _get_client() -> Optional["OpenAI"]:
+    global _CLIENT
+    if _CLIENT is None and _online():
+        _CLIENT = OpenAI()
+    return _CLIENT
+
+
+def _get_async_client() -> Optional["AsyncOpenAI"]:
+    global _ASYNC_CLIENT
+    if not _online():
+        return None
+    loop = asyncio.get_running_loop()
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT[0] is not loop:
+        _ASYNC_CLIENT = (loop, AsyncOpenAI())
+    return _ASYNC_CLIENT[1]
+
+
+# Rule-based categories: keyword pattern -> canned subtasks (checked in this order).
+# Keywords match at the start of a word so inflections (cleaned, houses, studies) still
+# count; "home" must be the whole word so "homework" doesn't trigger the cleaning plan.
+_CATEGORIES = (
+    (re.compile(r"\b(?:clean|house|homes?\b)"), [
+        "clean living room",
+        "clean kitchen",
+        "take out trash",
+        "do laundry",
+    ]),
+    (re.compile(r"\b(?:grocer|shop|buy|bought)"), [
+        "make grocery list",
+        "go grocery shopping",
+        "put groceries away"
+    ]),
+    (re.compile(r"\b(?:stud(?:y|i)|learn)"), [
+        "review notes",
+        "practice examples",
+        "summarize learnings"
+    ]),
+)
+
 
 def _rule_based_decompose(goal: str) -> List[str]:
     """
@@ -17,27 +69,9 @@ def _rule_based_decompose(goal: str) -> List[str]:
     """
     g = goal.lower()
     tasks = []
-
-    # Example heuristics
-    if "clean" in g or "house" in g or "home" in g:
-        tasks.extend([
-            "clean living room",
-            "clean kitchen",
-            "take out trash",
-            "do laundry",
-        ])
-    if "grocery" in g or "shopping" in g or "buy" in g:
-        tasks.extend([
-            "make grocery list",
-            "go grocery shopping",
-            "put groceries away"
-        ])
-    if "study" in g or "learn" in g:
-        tasks.extend([
-            "review notes",
-            "practice examples",
-            "summarize learnings"
-        ])
+    for pattern, subtasks in _CATEGORIES:
+        if pattern.search(g):
+            tasks.extend(subtasks)
     if not tasks:
         # fallback generic breakdown
         tasks = [
@@ -48,30 +82,49 @@ def _rule_based_decompose(goal: str) -> List[str]:
     return tasks
 
 
-def _gpt_decompose(goal: str) -> Optional[List[str]]:
-    """Smart multi-step decomposition using GPT (if online)."""
-    if not OPENAI_AVAILABLE or not os.environ.get("OPENAI_API_KEY"):
-        return None
-
-    client = OpenAI()
-    prompt = (
+def _decompose_prompt(goal: str) -> str:
+    return (
         "Break the following goal into 3-7 short actionable to-do subtasks, "
         "return them as a plain JSON list of strings. No explanation.\n"
         f"Goal: {goal}"
     )
 
+
+def _parse_subtasks(txt: str) -> Optional[List[str]]:
+    arr = json.loads(txt.strip())
+    if isinstance(arr, list):
+        return [str(x).strip() for x in arr if x]
+    return None
+
+
+def _gpt_decompose(goal: str) -> Optional[List[str]]:
+    """Smart multi-step decomposition using GPT (if online)."""
+    client = _get_client()
+    if client is None:
+        return None
+
     try:
         resp = client.responses.create(
             model=os.environ.get("AGENT_MODEL", "gpt-4o-mini"),
-            input=prompt,
+            input=_decompose_prompt(goal),
         )
-        txt = resp.output_text.strip()
-        # try json extraction
-        import json
-        arr = json.loads(txt)
-        if isinstance(arr, list):
-            return [str(x).strip() for x in arr if x]
+        return _parse_subtasks(resp.output_text)
+    except Exception:
+        return None
+
+
+async def _agpt_decompose(goal: str) -> Optional[List[str]]:
+    """Async twin of _gpt_decompose."""
+    client = _get_async_client()
+    if client is None:
         return None
+
+    try:
+        resp = await client.responses.create(
+            model=os.environ.get("AGENT_MODEL", "gpt-4o-mini"),
+            input=_decompose_prompt(goal),
+        )
+        return _parse_subtasks(resp.output_text)
     except Exception:
         return None
 
@@ -85,3 +138,26 @@ def plan(goal: str) -> List[str]:
     # create minimal reflection entry
     add_reflection(f"Planned {len(tasks)} tasks for goal: {goal}")
     return tasks
+
+
+async def aplan(goal: str) -> List[str]:
+    """Async plan(): the GPT round-trip doesn't block the event loop."""
+    return (await aplan_many([goal]))[0]
+
+
+async def aplan_many(goals: List[str]) -> List[List[str]]:
+    """
+    Decompose several goals concurrently (latency ~ slowest goal, not the sum).
+    Returns one subtask list per goal, in order.
+    """
+    decomposed = await asyncio.gather(*(_agpt_decompose(g) for g in goals))
+    plans = [d or _rule_based_decompose(g) for g, d in zip(goals, decomposed)]
+
+    # Reflections share one JSON file (read-modify-write): write them sequentially,
+    # off the event loop.
+    def _reflect() -> None:
+        for goal, tasks in zip(goals, plans):
+            add_reflection(f"Planned {len(tasks)} tasks for goal: {goal}")
+
+    await asyncio.to_thread(_reflect)
+    return plans
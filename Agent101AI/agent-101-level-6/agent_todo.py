@@ -149,6 +149,22 @@ def add_task(title: str, due: Optional[str] = None) -> Dict[str, Any]:
         tid = cur.lastrowid
     return {"id": tid, "title": title, "due": due, "done": False}
 
+def add_tasks(rows: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+    """Insert many (title, due) rows in one transaction: one commit instead of one per task."""
+    rows = list(rows)
+    if not rows:
+        return []
+    with get_db() as con:  # commits on exit, rolls back on error
+        cur = con.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        cur.executemany("INSERT INTO tasks(title, due) VALUES (?, ?)", rows)
+        last = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
+    first = last - len(rows) + 1
+    return [
+        {"id": first + i, "title": title, "due": due, "done": False}
+        for i, (title, due) in enumerate(rows)
+    ]
+
 def list_tasks(show_done: bool = True) -> List[Dict[str, Any]]:
     with get_db() as con:
         cur = con.cursor()
@@ -777,11 +793,8 @@ def _local_heuristic_fallback(user_text: str) -> Optional[str]:
         if not goal:
             return "What should I plan?"
         tasks = planner_plan(goal)
-        out = []
-        for t in tasks:
-            agent_add_task(t)
-            out.append(f" - {t}")
-        return "Planned tasks:\n" + "\n".join(out)
+        add_tasks([(_sanitize_title(t), None) for t in tasks])
+        return "Planned tasks:\n" + "\n".join(f" - {t}" for t in tasks)
 
     # reflect (view memory)
     if s in {"reflect", "show reflections", "history reflect", "reflection"}:
@@ -1007,11 +1020,8 @@ def run_cli() -> None:
             if user.lower().startswith("plan "):
                 goal = user[5:].strip()
                 tasks = planner_plan(goal)
-                out = []
-                for t in tasks:
-                    agent_add_task(t)  # uses your existing DB-safe wrapper
-                    out.append(f" - {t}")
-                print("\nASSISTANT:\nPlanned tasks:\n" + "\n".join(out) + "\n")
+                add_tasks([(_sanitize_title(t), None) for t in tasks])  # one transaction for the whole plan
+                print("\nASSISTANT:\nPlanned tasks:\n" + "\n".join(f" - {t}" for t in tasks) + "\n")
                 continue
 
             # intercept "reflect" before GPT
@@ -0,0 +1,220 @@
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime
+from unittest import mock
+
+import diskcache
+
+from weather_ai.tools import api
+from weather_ai.tools.api import (
+    _aggregate_monthly,
+    _last_of_month,
+    _singleflight,
+    _trend_schedule,
+)
+from weather_ai.utils import cache
+
+
+class TempCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._prev = cache._cache
+        cache._cache = diskcache.Cache(self._tmp.name)
+
+    def tearDown(self):
+        cache._cache.close()
+        cache._cache = self._prev
+        self._tmp.cleanup()
+
+
+class TestAggregateMonthly(unittest.TestCase):
+    def test_monthly_means(self):
+        dates = ["2025-01-30", "2025-01-31", "2025-02-01"]
+        daily = {
+            "time": dates,
+            "temperature_2m_max": [10.0, 12.0, 20.0],
+            "temperature_2m_min": [0.0, 2.0, 5.0],
+        }
+        out = _aggregate_monthly(daily)
+        self.assertListEqual(list(out.keys()), ["2025-01", "2025-02"])
+        self.assertAlmostEqual(out["2025-01"]["t_max_c"], 11.0)
+        self.assertAlmostEqual(out["2025-01"]["t_min_c"], 1.0)
+        self.assertAlmostEqual(out["2025-02"]["t_max_c"], 20.0)
+        self.assertAlmostEqual(out["2025-02"]["t_min_c"], 5.0)
+
+    def test_skips_missing_values(self):
+        dates = ["2025-03-01", "2025-03-02", "2025-03-03"]
+        daily = {
+            "time": dates,
+            "temperature_2m_max": [10.0, 14.0, None],
+            "temperature_2m_min": [2.0, 4.0, None],
+        }
+        out = _aggregate_monthly(daily)
+        self.assertAlmostEqual(out["2025-03"]["t_max_c"], 12.0)
+        self.assertAlmostEqual(out["2025-03"]["t_min_c"], 3.0)
+
+    def test_unix_seconds(self):
+        # 2025-01-31 and 2025-02-01 at local midnight, already shifted to local time.
+        dates = [1738281600, 1738368000]
+        daily = {"time": dates, "temperature_2m_max": [10.0, 20.0], "temperature_2m_min": [0.0, 5.0]}
+        out = _aggregate_monthly(daily)
+        self.assertListEqual(list(out.keys()), ["2025-01", "2025-02"])
+        self.assertAlmostEqual(out["2025-02"]["t_max_c"], 20.0)
+
+    def test_empty(self):
+        empty = {"time": [], "temperature_2m_max": [], "temperature_2m_min": []}
+        self.assertDictEqual(_aggregate_monthly(empty), {})
+
+
+class TestMonthBounds(unittest.TestCase):
+    def test_last_of_month(self):
+        self.assertEqual(_last_of_month(datetime(2024, 2, 10)), datetime(2024, 2, 29))
+        self.assertEqual(_last_of_month(datetime(2025, 2, 1)), datetime(2025, 2, 28))
+        self.assertEqual(_last_of_month(datetime(2025, 12, 31)), datetime(2025, 12, 31))
+
+    def test_trend_schedule(self):
+        start, end, months = _trend_schedule(date(2025, 10, 15))
+        self.assertEqual((start, end), ("2025-03-01", "2025-09-30"))
+        self.assertEqual([m.strftime("%Y-%m") for m in months], [
+            "2025-11", "2025-12", "2026-01", "2026-02", "2026-03", "2026-04",
+        ])
+
+
+class TestSingleflight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        entered = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        @_singleflight
+        def slow_fetch(city):
+            calls.append(city)
+            entered.set()
+            release.wait(5)
+            return {"city": city}
+
+        results = []
+
+        def call():
+            results.append(slow_fetch("Phoenix"))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        entered.wait(5)
+        followers = [threading.Thread(target=call) for _ in range(3)]
+        for t in followers:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in [leader, *followers]:
+            t.join(5)
+
+        self.assertEqual(calls, ["Phoenix"])
+        self.assertEqual(results, [{"city": "Phoenix"}] * 4)
+
+    def test_errors_propagate_to_followers_and_are_not_kept(self):
+        calls = []
+
+        @_singleflight
+        def failing(city):
+            calls.append(city)
+            raise ValueError(f"Couldn't find {city}")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                failing("Atlantis")
+        self.assertEqual(len(calls), 2)
+
+
+class TestNegativeCache(TempCacheTestCase):
+    def test_geocode_miss_is_cached(self):
+        resp = mock.Mock(content=b'{"generationtime_ms": 0.1}')
+        with mock.patch.object(api._SESSION, "get", return_value=resp) as get:
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    api.geocode("Phoenx")
+        self.assertEqual(get.call_count, 1)
+
+    def test_geocode_hit_is_cached_across_spellings(self):
+        body = b'{"results": [{"latitude": 33.45, "longitude": -112.07, "timezone": "America/Phoenix"}]}'
+        resp = mock.Mock(content=body)
+        with mock.patch.object(api._SESSION, "get", return_value=resp) as get:
+            first = api.geocode("Phoenix")
+            second = api.geocode("  phoenix ")
+        self.assertEqual(first, (33.45, -112.07, "America/Phoenix"))
+        self.assertEqual(second, first)
+        self.assertEqual(get.call_count, 1)
+
+
+class TestSixMonthTrend(TempCacheTestCase):
+    def test_batches_history_and_climatology(self):
+        seen = []
+
+        def fake_archive(params):
+            seen.append((params["start_date"], params["end_date"]))
+            if params["start_date"] == "2025-03-01":
+                return {
+                    "time": ["2025-08-31", "2025-09-01"],
+                    "temperature_2m_max": [40.0, 38.0],
+                    "temperature_2m_min": [28.0, 26.0],
+                }
+            year = int(params["start_date"][:4])
+            return {"temperature_2m_max": [float(year - 2000)], "temperature_2m_min": [0.0]}
+
+        with mock.patch.multiple(
+            api,
+            geocode=mock.Mock(return_value=(33.45, -112.07, "America/Phoenix")),
+            _archive_daily=mock.Mock(side_effect=fake_archive),
+            _trend_schedule=mock.Mock(return_value=_trend_schedule(date(2025, 10, 15))),
+        ):
+            out = api.fetch_six_month_trend("Phoenix")
+            again = api.fetch_six_month_trend("Phoenix, AZ")
+
+        self.assertEqual(len(seen), 61)
+        self.assertEqual(again["past_6_months"], out["past_6_months"])
+        self.assertEqual(again["next_6_months"], out["next_6_months"])
+        self.assertIn(("2024-11-01", "2024-11-30"), seen)
+        self.assertIn(("2016-04-01", "2016-04-30"), seen)
+        self.assertEqual([m["month"] for m in out["past_6_months"]], ["2025-08", "2025-09"])
+        self.assertEqual(len(out["next_6_months"]), 6)
+        nov = out["next_6_months"][0]
+        self.assertEqual(nov["month"], "2025-11")
+        # Mean of 2015..2024 offsets from 2000.
+        self.assertAlmostEqual(nov["t_max_c"], 19.5)
+
+    def test_refresh_refetches_cached_blocks(self):
+        body = (
+            b'{"utc_offset_seconds": 0, "daily": {"time": [1756684800],'
+            b' "temperature_2m_max": [30.0], "temperature_2m_min": [20.0]}}'
+        )
+        resp = mock.MagicMock()
+        resp.__enter__.return_value = resp
+        resp.raw.read.return_value = body
+
+        with mock.patch.multiple(
+            api,
+            geocode=mock.Mock(return_value=(33.45, -112.07, "America/Phoenix")),
+            _trend_schedule=mock.Mock(return_value=_trend_schedule(date(2025, 10, 15))),
+        ), mock.patch.object(api._SESSION, "get", return_value=resp) as get:
+            api.fetch_six_month_trend("Phoenix")
+            self.assertEqual(get.call_count, 61)
+            api.fetch_six_month_trend("Phoenix")
+            self.assertEqual(get.call_count, 61)
+            out = api.fetch_six_month_trend("Phoenix", refresh=True)
+            self.assertEqual(get.call_count, 122)
+        self.assertEqual(out["past_6_months"][0]["month"], "2025-09")
+
+    def test_missing_history_returns_error(self):
+        with mock.patch.multiple(
+            api,
+            geocode=mock.Mock(return_value=(0.0, 0.0, "UTC")),
+            _archive_daily=mock.Mock(return_value=None),
+        ):
+            out = api.fetch_six_month_trend("Nowhere")
+        self.assertEqual(out, {"error": "No historical data for Nowhere"})
+
+
+if __name__ == "__main__":
+    unittest.main()
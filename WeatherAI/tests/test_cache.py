@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+
+import diskcache
+
+from weather_ai.utils import cache
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._prev = cache._cache
+        cache._cache = diskcache.Cache(self._tmp.name)
+
+    def tearDown(self):
+        cache._cache.close()
+        cache._cache = self._prev
+        self._tmp.cleanup()
+
+    def test_normalize_city(self):
+        self.assertEqual(cache.normalize_city("  Salt   Lake City "), "salt lake city")
+        self.assertEqual(cache.normalize_city("PHOENIX"), cache.normalize_city("phoenix"))
+
+    def test_get_or_fetch_hits_disk_after_first_call(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {"t_max_c": 30.0}
+
+        params = {"city": "phoenix", "when": "today"}
+        self.assertEqual(cache.get_or_fetch("forecast", params, 60, fetch), {"t_max_c": 30.0})
+        self.assertEqual(cache.get_or_fetch("forecast", params, 60, fetch), {"t_max_c": 30.0})
+        self.assertEqual(len(calls), 1)
+
+    def test_error_payloads_are_not_cached(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {"error": "No historical data"}
+
+        cache.get_or_fetch("trend", {"city": "nowhere"}, 60, fetch)
+        cache.get_or_fetch("trend", {"city": "nowhere"}, 60, fetch)
+        self.assertEqual(len(calls), 2)
+
+    def test_cache_delete_forces_refetch(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {"past_6_months": []}
+
+        cache.get_or_fetch("trend", {"city": "phoenix"}, 60, fetch)
+        cache.cache_delete("trend", {"city": "phoenix"})
+        cache.get_or_fetch("trend", {"city": "phoenix"}, 60, fetch)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,66 +1,195 @@
 from __future__ import annotations
 
+import calendar
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import orjson
 import requests
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Tuple, Optional
-from collections import defaultdict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Tuple, Optional, Callable, TypeVar
+
+from weather_ai.utils.cache import (
+    ARCHIVE_MISS_TTL,
+    CLIMATOLOGY_TTL,
+    GEOCODE_MISS_TTL,
+    GEOCODE_TTL,
+    NEGATIVE,
+    TREND_TTL,
+    cache_get,
+    cache_set,
+    normalize_city,
+)
 
 BASE_GEOCODE = "https://geocoding-api.open-meteo.com/v1/search"
 BASE_ARCHIVE = "https://archive-api.open-meteo.com/v1/era5"
+MAX_ARCHIVE_BYTES = 10 * 1024 * 1024
+_DAILY_FIELDS = ("time", "temperature_2m_max", "temperature_2m_min")
+CLIMATOLOGY_YEARS = 10
+ARCHIVE_WORKERS = 16
+
+# One keep-alive session for all Open-Meteo calls so TLS handshakes are paid once per host.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=50,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_inflight: Dict[tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _singleflight(func: F) -> F:
+    """Coalesce concurrent identical calls: followers wait on the leader's result."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        with _inflight_lock:
+            fut = _inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = _inflight[key] = Future()
+        if not leader:
+            return fut.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            fut.set_exception(exc)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+
+    return wrapper  # type: ignore[return-value]
+
 
+def _json(resp: requests.Response) -> Any:
+    # orjson parses the large ERA5 float arrays several times faster than stdlib json.
+    return orjson.loads(resp.content)
 
-def _ymd(dt: datetime) -> str:
+
+def _archive_daily(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fetch an ERA5 range and keep only the daily arrays we aggregate (None if absent)."""
+    if cache_get("archive-miss", params) == NEGATIVE:
+        return None
+    with _SESSION.get(BASE_ARCHIVE, params=params, timeout=30, stream=True) as resp:
+        body = resp.raw.read(MAX_ARCHIVE_BYTES + 1, decode_content=True)
+    if len(body) > MAX_ARCHIVE_BYTES:
+        raise ValueError("Archive response exceeded size limit")
+    payload = orjson.loads(body)
+    daily = payload.get("daily")
+    if not daily:
+        cache_set("archive-miss", params, NEGATIVE, ARCHIVE_MISS_TTL)
+        return None
+    out = {k: daily[k] for k in _DAILY_FIELDS if k in daily}
+    if params.get("timeformat") == "unixtime" and "time" in out:
+        # Unix timestamps come back in GMT; shift by the offset so days bucket in local time.
+        out["time"] = np.asarray(out["time"], dtype=np.int64) + int(payload.get("utc_offset_seconds", 0))
+    return out
+
+
+def _ymd(dt: date) -> str:
     return dt.strftime("%Y-%m-%d")
 
 
-def _first_of_month(dt: datetime) -> datetime:
+def _first_of_month(dt: date) -> date:
     return dt.replace(day=1)
 
 
-def _last_of_month(dt: datetime) -> datetime:
-    nxt = (dt.replace(day=28) + timedelta(days=4)).replace(day=1)
-    return nxt - timedelta(days=1)
-
-
-def _aggregate_monthly(daily: Dict[str, List[float]], dates: List[str]) -> Dict[str, Dict[str, float]]:
-    by_month_max: Dict[str, List[float]] = defaultdict(list)
-    by_month_min: Dict[str, List[float]] = defaultdict(list)
-    for i, d in enumerate(dates):
-        ym = d[:7]
-        by_month_max[ym].append(daily["temperature_2m_max"][i])
-        by_month_min[ym].append(daily["temperature_2m_min"][i])
-    out: Dict[str, Dict[str, float]] = {}
-    for ym in sorted(by_month_max.keys()):
-        out[ym] = {
-            "t_max_c": sum(by_month_max[ym]) / len(by_month_max[ym]),
-            "t_min_c": sum(by_month_min[ym]) / len(by_month_min[ym]),
-        }
-    return out
+def _last_of_month(dt: date) -> date:
+    return dt.replace(day=calendar.monthrange(dt.year, dt.month)[1])
+
+
+@functools.lru_cache(maxsize=32)
+def _trend_schedule(today: date) -> Tuple[str, str, Tuple[date, ...]]:
+    """History window (start, end) and the next six months; only changes once a day."""
+    start_hist = _first_of_month((today.replace(day=1) - timedelta(days=1)).replace(day=1) - timedelta(days=5 * 31))
+    end_hist = _last_of_month(today.replace(day=1) - timedelta(days=1))
+    months_ahead: List[date] = []
+    m = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    for _ in range(6):
+        months_ahead.append(m)
+        m = (m + timedelta(days=32)).replace(day=1)
+    return _ymd(start_hist), _ymd(end_hist), tuple(months_ahead)
+
+
+def _aggregate_monthly(daily: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Monthly means keyed "YYYY-MM"; daily["time"] is "YYYY-MM-DD" strings or local unix seconds."""
+    dates = np.asarray(daily.get("time", []))
+    if dates.size == 0:
+        return {}
+    if dates.dtype.kind in "iuf":
+        days = (dates.astype(np.int64) // 86400).astype("datetime64[D]")
+    else:
+        days = dates.astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    t_max = np.asarray(daily["temperature_2m_max"], dtype=np.float64)
+    t_min = np.asarray(daily["temperature_2m_min"], dtype=np.float64)
+    # ERA5 lags a few days behind, so trailing values can come back as null (NaN here).
+    keep = ~(np.isnan(t_max) | np.isnan(t_min))
+    order = np.argsort(months[keep], kind="stable")
+    months, t_max, t_min = months[keep][order], t_max[keep][order], t_min[keep][order]
+    if months.size == 0:
+        return {}
+    uniq, start_idx, counts = np.unique(months, return_index=True, return_counts=True)
+    means_max = np.add.reduceat(t_max, start_idx) / counts
+    means_min = np.add.reduceat(t_min, start_idx) / counts
+    return {
+        ym: {"t_max_c": float(hi), "t_min_c": float(lo)}
+        for ym, hi, lo in zip(np.datetime_as_string(uniq, unit="M"), means_max, means_min)
+    }
 
 
 def geocode(city: str) -> Tuple[float, float, str]:
     city = (city or "").strip()
     if not city:
         raise ValueError("City is required")
-    g = requests.get(BASE_GEOCODE, params={"name": city, "count": 1}, timeout=20).json()
+    key = {"name": normalize_city(city)}
+    hit = cache_get("geocode", key)
+    if hit == NEGATIVE:
+        raise ValueError(f"Couldn't find {city}")
+    if hit is not None:
+        return tuple(hit)
+    g = _json(_SESSION.get(BASE_GEOCODE, params={"name": city, "count": 1}, timeout=20))
     if not g.get("results"):
+        cache_set("geocode", key, NEGATIVE, GEOCODE_MISS_TTL)
         raise ValueError(f"Couldn't find {city}")
     r = g["results"][0]
-    return r["latitude"], r["longitude"], r.get("timezone", "auto")
+    loc = (r["latitude"], r["longitude"], r.get("timezone", "auto"))
+    cache_set("geocode", key, loc, GEOCODE_TTL)
+    return loc
 
 
+@_singleflight
 def fetch_forecast(city: str, when: Optional[str] = "today") -> Dict[str, Any]:
     lat, lon, tz = geocode(city)
-    w = requests.get(
-        "https://api.open-meteo.com/v1/forecast",
-        params={
-            "latitude": lat,
-            "longitude": lon,
-            "daily": "temperature_2m_max,temperature_2m_min,weathercode",
-            "timezone": tz,
-        },
-        timeout=20,
-    ).json()
+    w = _json(
+        _SESSION.get(
+            "https://api.open-meteo.com/v1/forecast",
+            params={
+                "latitude": lat,
+                "longitude": lon,
+                "daily": "temperature_2m_max,temperature_2m_min,weathercode",
+                "timezone": tz,
+            },
+            timeout=20,
+        )
+    )
     d0 = w["daily"]
     idx = 1 if (when == "tomorrow" and len(d0["time"]) > 1) else 0
     return {
@@ -74,77 +203,81 @@ def fetch_forecast(city: str, when: Optional[str] = "today") -> Dict[str, Any]:
     }
 
 
-def fetch_six_month_trend(city: str) -> Dict[str, Any]:
-    lat, lon, tz = geocode(city)
-    today = datetime.now(timezone.utc).astimezone()
-    start_hist = _first_of_month((today.replace(day=1) - timedelta(days=1)).replace(day=1) - timedelta(days=5 * 31))
-    end_hist = _last_of_month(today.replace(day=1) - timedelta(days=1))
-
-    hist = requests.get(
-        BASE_ARCHIVE,
-        params={
-            "latitude": lat,
-            "longitude": lon,
-            "start_date": _ymd(start_hist),
-            "end_date": _ymd(end_hist),
-            "daily": "temperature_2m_max,temperature_2m_min",
-            "timezone": tz,
-        },
-        timeout=30,
-    ).json()
-
-    if "daily" not in hist:
-        return {"error": f"No historical data for {city}"}
-
-    monthly_hist = _aggregate_monthly(hist["daily"], hist["daily"]["time"])
-    last_6_keys = sorted([k for k in monthly_hist.keys()])[-6:]
-    past_6 = [{"month": k, **monthly_hist[k]} for k in last_6_keys]
-
+def _climatology(
+    months_ahead: Tuple[date, ...], blocks: List[Optional[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
     outlook = []
-    anchor = today.replace(day=1)
-    next_month = (anchor + timedelta(days=32)).replace(day=1)
-    months_ahead: List[datetime] = []
-    m = next_month
-    for _ in range(6):
-        months_ahead.append(m)
-        m = (m + timedelta(days=32)).replace(day=1)
-
-    for target in months_ahead:
-        accum_max: List[float] = []
-        accum_min: List[float] = []
-        for y in range(1, 11):
-            year = target.year - y
-            s = target.replace(year=year, day=1)
-            e = _last_of_month(s)
-            block = requests.get(
-                BASE_ARCHIVE,
-                params={
-                    "latitude": lat,
-                    "longitude": lon,
-                    "start_date": _ymd(s),
-                    "end_date": _ymd(e),
-                    "daily": "temperature_2m_max,temperature_2m_min",
-                    "timezone": tz,
-                },
-                timeout=30,
-            ).json()
-            if "daily" not in block:
+    for i, target in enumerate(months_ahead):
+        sum_max = sum_min = 0.0
+        n_years = 0
+        for dd in blocks[i * CLIMATOLOGY_YEARS : (i + 1) * CLIMATOLOGY_YEARS]:
+            if dd is None:
                 continue
-            dd = block["daily"]
             if dd.get("temperature_2m_max"):
-                accum_max.append(sum(dd["temperature_2m_max"]) / len(dd["temperature_2m_max"]))
-                accum_min.append(sum(dd["temperature_2m_min"]) / len(dd["temperature_2m_min"]))
-        if accum_max and accum_min:
+                sum_max += sum(dd["temperature_2m_max"]) / len(dd["temperature_2m_max"])
+                sum_min += sum(dd["temperature_2m_min"]) / len(dd["temperature_2m_min"])
+                n_years += 1
+        if n_years:
             outlook.append(
                 {
                     "month": target.strftime("%Y-%m"),
-                    "t_max_c": sum(accum_max) / len(accum_max),
-                    "t_min_c": sum(accum_min) / len(accum_min),
+                    "t_max_c": sum_max / n_years,
+                    "t_min_c": sum_min / n_years,
                     "method": "10y monthly climatology (naive seasonal)",
                 }
             )
         else:
             outlook.append({"month": target.strftime("%Y-%m"), "error": "insufficient data for climatology"})
+    return outlook
+
+
+@_singleflight
+def fetch_six_month_trend(city: str, refresh: bool = False) -> Dict[str, Any]:
+    """Past 6 monthly means plus a climatology outlook; refresh=True bypasses the cached blocks."""
+    lat, lon, tz = geocode(city)
+    start_hist, end_hist, months_ahead = _trend_schedule(datetime.now(timezone.utc).astimezone().date())
+    # Key the heavy work on the ERA5 grid cell, so "NYC" and "New York" share results.
+    cell = {"lat": round(lat, 1), "lon": round(lon, 1), "tz": tz}
+    past_key = {**cell, "start": start_hist, "end": end_hist}
+    clim_key = {**cell, "months": [m.isoformat() for m in months_ahead]}
+    past_6 = None if refresh else cache_get("trend-past", past_key)
+    outlook = None if refresh else cache_get("trend-climatology", clim_key)
+
+    base_params = {
+        "latitude": cell["lat"],
+        "longitude": cell["lon"],
+        "daily": "temperature_2m_max,temperature_2m_min",
+        "timezone": tz,
+        "timeformat": "unixtime",
+        "cell_selection": "nearest",
+    }
+    # The past-6 window and all 60 climatology months are independent: issue them as one batch.
+    batch = []
+    if past_6 is None:
+        batch.append({**base_params, "start_date": start_hist, "end_date": end_hist})
+    if outlook is None:
+        for target in months_ahead:
+            for y in range(1, CLIMATOLOGY_YEARS + 1):
+                s = target.replace(year=target.year - y, day=1)
+                batch.append({**base_params, "start_date": _ymd(s), "end_date": _ymd(_last_of_month(s))})
+
+    if batch:
+        with ThreadPoolExecutor(max_workers=ARCHIVE_WORKERS) as pool:
+            futures = [pool.submit(_archive_daily, p) for p in batch]
+            if past_6 is None:
+                hist = futures.pop(0).result()
+                if hist is None:
+                    for f in futures:
+                        f.cancel()
+                    return {"error": f"No historical data for {city}"}
+                monthly_hist = _aggregate_monthly(hist)
+                last_6_keys = sorted(monthly_hist.keys())[-6:]
+                past_6 = [{"month": k, **monthly_hist[k]} for k in last_6_keys]
+                cache_set("trend-past", past_key, past_6, TREND_TTL)
+            if outlook is None:
+                outlook = _climatology(months_ahead, [f.result() for f in futures])
+                if not any("error" in m for m in outlook):
+                    cache_set("trend-climatology", clim_key, outlook, CLIMATOLOGY_TTL)
 
     return {
         "city": city,
@@ -152,4 +285,3 @@ def fetch_six_month_trend(city: str) -> Dict[str, Any]:
         "next_6_months": outlook,
         "notes": "Outlook is a seasonal baseline (not a deterministic forecast).",
     }
-
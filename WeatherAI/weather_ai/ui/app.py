@@ -1,12 +1,40 @@
+from __future__ import annotations
+
 import os
+import re
+import json
+import html as html_lib
 import time
 import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 import streamlit as st
 import streamlit.components.v1 as components
-import plotly.graph_objects as go
 
 from weather_ai.utils.units import c_to_f, make_trend_df, format_quick_weather_text
 from weather_ai.tools.api import fetch_forecast, fetch_six_month_trend
+from weather_ai.utils.cache import (
+    FORECAST_TTL,
+    TREND_TTL,
+    cache_delete,
+    cache_set,
+    get_or_fetch,
+    normalize_city,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Set once at import; render() runs on every Streamlit rerun.
+if os.name == "nt":
+    try:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    except Exception:
+        pass
+
+
+_KEYS_INITIALIZED = False
 
 
 def _ensure_key_from_secrets() -> None:
@@ -19,6 +47,9 @@ def _ensure_key_from_secrets() -> None:
             pass
 
 
+_DOTENV_RE = re.compile(r"^[ \t]*OPENAI_API_KEY=(.*)$", re.M)
+
+
 def _ensure_key_from_dotenv() -> None:
     if os.getenv("OPENAI_API_KEY"):
         return
@@ -26,87 +57,145 @@ def _ensure_key_from_dotenv() -> None:
         for candidate in (".env", ".streamlit/.env"):
             if os.path.exists(candidate):
                 with open(candidate, "r", encoding="utf-8") as fh:
-                    for line in fh:
-                        line = line.strip()
-                        if not line or line.startswith("#"):
-                            continue
-                        if line.startswith("OPENAI_API_KEY="):
-                            val = line.split("=", 1)[1].strip().strip('"').strip("'")
-                            if val:
-                                os.environ["OPENAI_API_KEY"] = val
-                            return
+                    m = _DOTENV_RE.search(fh.read())
+                if m:
+                    val = m.group(1).strip().strip('"').strip("'")
+                    if val:
+                        os.environ["OPENAI_API_KEY"] = val
+                    return
     except Exception:
         pass
 
 
+_MAPBOX_TOKEN: str | None = None
+_MAPBOX_RESOLVED = False
+
+
 def _get_mapbox_token() -> str | None:
+    # Resolved once per process, like the OpenAI key: st.secrets parses TOML on first access.
+    global _MAPBOX_TOKEN, _MAPBOX_RESOLVED
+    if _MAPBOX_RESOLVED:
+        return _MAPBOX_TOKEN
     token = os.getenv("MAPBOX_TOKEN")
-    if token:
-        return token
-    try:
-        token = st.secrets.get("MAPBOX_TOKEN", "")
-        if token:
-            os.environ["MAPBOX_TOKEN"] = str(token)
-            return str(token)
-    except Exception:
-        pass
-    return None
+    if not token:
+        try:
+            token = str(st.secrets.get("MAPBOX_TOKEN", "")) or None
+            if token:
+                os.environ["MAPBOX_TOKEN"] = token
+        except Exception:
+            token = None
+    _MAPBOX_TOKEN = token
+    _MAPBOX_RESOLVED = True
+    return token
+
+
+_WEATHER_DEFAULT: tuple[str, str] = ("🌡️", "Weather")
+_WEATHER_CODES: dict[int, tuple[str, str]] = {
+    0: ("☀️", "Clear sky"),
+    1: ("🌤️", "Mainly clear"),
+    2: ("⛅", "Partly cloudy"),
+    3: ("☁️", "Overcast"),
+    45: ("🌫️", "Fog"),
+    48: ("🌫️", "Depositing rime fog"),
+    51: ("🌦️", "Light drizzle"),
+    53: ("🌧️", "Drizzle"),
+    55: ("🌧️", "Dense drizzle"),
+    56: ("🌧️❄️", "Freezing drizzle"),
+    57: ("🌧️❄️", "Dense freezing drizzle"),
+    61: ("🌦️", "Light rain"),
+    63: ("🌧️", "Rain"),
+    65: ("🌧️", "Heavy rain"),
+    66: ("🌧️❄️", "Freezing rain"),
+    67: ("🌧️❄️", "Heavy freezing rain"),
+    71: ("🌨️", "Light snow"),
+    73: ("🌨️", "Snow"),
+    75: ("❄️", "Heavy snow"),
+    77: ("❄️", "Snow grains"),
+    80: ("🌦️", "Rain showers"),
+    81: ("🌧️", "Heavy showers"),
+    82: ("⛈️", "Violent showers"),
+    85: ("🌨️", "Snow showers"),
+    86: ("❄️", "Heavy snow showers"),
+    95: ("⛈️", "Thunderstorm"),
+    96: ("⛈️", "Thunderstorm with hail"),
+    99: ("⛈️", "Thunderstorm with heavy hail"),
+}
+# Open-Meteo WMO codes are small ints (0-99): index a tuple instead of hashing a dict.
+_WC: tuple[tuple[str, str], ...] = tuple(_WEATHER_CODES.get(i, _WEATHER_DEFAULT) for i in range(100))
 
 
 def weathercode_emoji_desc(code: int) -> tuple[str, str]:
-    mapping = {
-        0: ("☀️", "Clear sky"),
-        1: ("🌤️", "Mainly clear"),
-        2: ("⛅", "Partly cloudy"),
-        3: ("☁️", "Overcast"),
-        45: ("🌫️", "Fog"),
-        48: ("🌫️", "Depositing rime fog"),
-        51: ("🌦️", "Light drizzle"),
-        53: ("🌧️", "Drizzle"),
-        55: ("🌧️", "Dense drizzle"),
-        56: ("🌧️❄️", "Freezing drizzle"),
-        57: ("🌧️❄️", "Dense freezing drizzle"),
-        61: ("🌦️", "Light rain"),
-        63: ("🌧️", "Rain"),
-        65: ("🌧️", "Heavy rain"),
-        66: ("🌧️❄️", "Freezing rain"),
-        67: ("🌧️❄️", "Heavy freezing rain"),
-        71: ("🌨️", "Light snow"),
-        73: ("🌨️", "Snow"),
-        75: ("❄️", "Heavy snow"),
-        77: ("❄️", "Snow grains"),
-        80: ("🌦️", "Rain showers"),
-        81: ("🌧️", "Heavy showers"),
-        82: ("⛈️", "Violent showers"),
-        85: ("🌨️", "Snow showers"),
-        86: ("❄️", "Heavy snow showers"),
-        95: ("⛈️", "Thunderstorm"),
-        96: ("⛈️", "Thunderstorm with hail"),
-        99: ("⛈️", "Thunderstorm with heavy hail"),
-    }
-    return mapping.get(int(code), ("🌡️", "Weather"))
-
-
-@st.cache_data(ttl=600, show_spinner=False)
+    c = int(code)
+    return _WC[c] if 0 <= c < 100 else _WEATHER_DEFAULT
+
+
+@st.cache_data(ttl=FORECAST_TTL, show_spinner=False)
+def _forecast_by_key(city_key: str, when: str):
+    params = {"city": city_key, "when": when}
+    return get_or_fetch("forecast", params, FORECAST_TTL, lambda: fetch_forecast(city_key, when))
+
+
+@st.cache_data(ttl=TREND_TTL, show_spinner=False)
+def _trend_by_key(city_key: str):
+    params = {"city": city_key}
+    return get_or_fetch("trend", params, TREND_TTL, lambda: fetch_six_month_trend(city_key))
+
+
 def cached_forecast(city: str, when: str):
-    return fetch_forecast(city, when)
+    # "Phoenix", "phoenix " and "PHOENIX" share one cache entry; keep the typed name for display.
+    return {**_forecast_by_key(normalize_city(city), when), "city": city.strip()}
 
 
-@st.cache_data(ttl=1800, show_spinner=False)
 def cached_trend(city: str):
-    return fetch_six_month_trend(city)
+    return {**_trend_by_key(normalize_city(city)), "city": city.strip()}
 
 
-def render() -> None:
-    _ensure_key_from_secrets()
-    _ensure_key_from_dotenv()
+def refresh_trend(city: str) -> None:
+    """Refetch city's trend from upstream and replace the in-process and on-disk entries."""
+    city_key = normalize_city(city)
+    trend = fetch_six_month_trend(city_key, refresh=True)
+    _trend_by_key.clear(city_key)
+    if "error" in trend:
+        cache_delete("trend", {"city": city_key})
+    else:
+        cache_set("trend", {"city": city_key}, trend, TREND_TTL)
+
+
+@st.cache_data(ttl=FORECAST_TTL, show_spinner=False)
+def _formatted_quick(payload: dict) -> tuple[str, str]:
+    # Format both unit systems once per payload; toggling units is then a tuple pick.
+    return format_quick_weather_text(payload, "°C"), format_quick_weather_text(payload, "°F")
 
-    if os.name == "nt":
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def _df_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
+_PREFETCH = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-prefetch")
+
+
+def _prefetch_default_city(city: str) -> None:
+    """Warm the forecast and trend caches for the default city in the background."""
+
+    def _quiet(fn, *args):
         try:
-            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+            fn(*args)
         except Exception:
             pass
 
+    _PREFETCH.submit(_quiet, cached_forecast, city, "today")
+    _PREFETCH.submit(_quiet, cached_trend, city)
+
+
+def render() -> None:
+    # Streamlit reruns render() on every interaction; probe secrets/.env once per process.
+    global _KEYS_INITIALIZED
+    if not _KEYS_INITIALIZED:
+        _ensure_key_from_secrets()
+        _ensure_key_from_dotenv()
+        _KEYS_INITIALIZED = True
+
     st.set_page_config(page_title="Weather Agent", page_icon="⛅", layout="centered")
 
     if not os.getenv("OPENAI_API_KEY"):
@@ -121,10 +210,16 @@ def render() -> None:
         units = st.radio("Units", ["°C", "°F"], index=0, horizontal=True)
         show_emoji = st.checkbox("Show emoji", value=True)
         desc_place = st.radio("Description", ["inline", "caption"], index=0, horizontal=True)
+        hq_globe = st.checkbox("High-quality satellite globe", value=False)
         st.markdown("---")
         st.write("Examples")
         st.code("Phoenix\nPhoenix tomorrow\nSalt Lake City trend")
 
+    # Overlap the user's first click with the default city's fetches (once per session).
+    if default_city.strip() and "prefetched" not in st.session_state:
+        st.session_state["prefetched"] = True
+        _prefetch_default_city(default_city)
+
     tab1, tab2 = st.tabs(["Quick Weather", "6-Month Trend"])
 
     # ---------- TAB 1: Quick Weather ----------
@@ -158,7 +253,8 @@ def render() -> None:
                     try:
                         payload = cached_forecast(city, when)
                         emoji, desc = weathercode_emoji_desc(payload.get("weathercode", -1))
-                        text = format_quick_weather_text(payload, units)
+                        text_c, text_f = _formatted_quick(payload)
+                        text = text_f if units == "°F" else text_c
                         display = text
                         if show_emoji:
                             display = f"{emoji} {display}"
@@ -181,13 +277,10 @@ def render() -> None:
                             lon = float(payload.get("lon"))
                             token = _get_mapbox_token()
                             if token:
-                                _render_globe_mapbox(token, lat, lon, city)
+                                _render_globe_mapbox(token, lat, lon, city, high_quality=hq_globe)
                             else:
-                                globe_ph = st.empty()
-                                for size in (4, 9, 14, 18):
-                                    fig = _build_globe(lat, lon, city, size)
-                                    globe_ph.plotly_chart(fig, use_container_width=True)
-                                    time.sleep(0.08)
+                                fig = _globe_figure(round(lat, 2), round(lon, 2), city, 18)
+                                st.plotly_chart(fig, use_container_width=True)
                         except Exception:
                             pass
 
@@ -201,92 +294,109 @@ def render() -> None:
                             col1.metric("High", f"{t_max_c:.1f} °C")
                             col2.metric("Low", f"{t_min_c:.1f} °C")
 
-                        hist = st.session_state.setdefault("history", [])
-                        hist.insert(0, {"city": city, "when": when, "units": units})
-                        st.session_state["history"] = hist[:6]
+                        hist = st.session_state.setdefault("history", deque(maxlen=6))
+                        hist.appendleft({"city": city, "when": when, "units": units})
                     except Exception as e:
                         st.error(f"Error: {e}")
 
     # ---------- TAB 2: Past & Next 6-Month Trend ----------
     with tab2:
-        city2 = st.text_input("City", value=default_city, key="city_trend")
-        explain = st.checkbox("Explain method", value=True)
-        if st.button("Get 6-month history & outlook", type="secondary"):
-            if not city2.strip():
-                st.error("Please enter a city.")
-            else:
-                with st.spinner("Computing monthly averages…"):
-                    t0 = time.time()
-                    try:
-                        trend = cached_trend(city2)
-                        t1 = time.time()
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-                        st.stop()
-
-            past_df = make_trend_df(trend.get("past_6", trend.get("past_6_months", [])), units)
-            next_df = make_trend_df(trend.get("next_6", trend.get("next_6_months", [])), units)
-
-            st.subheader(f"{city2}: Past 6 months (monthly averages)")
-            if not past_df.empty:
-                st.dataframe(past_df, use_container_width=True)
-                chart_df = past_df.rename(
-                    columns={
-                        "High (°C)": "High",
-                        "Low (°C)": "Low",
-                        "High (°F)": "High",
-                        "Low (°F)": "Low",
-                    }
-                ).set_index("Month")
-                st.line_chart(chart_df)
-                st.download_button(
-                    label="Download past 6 CSV",
-                    data=past_df.to_csv(index=False),
-                    file_name=f"{city2.replace(' ','_')}_past6.csv",
-                    mime="text/csv",
-                )
-            else:
-                st.write("No data.")
-
-            st.subheader(f"{city2}: Next 6 months (seasonal baseline)")
-            if not next_df.empty:
-                st.dataframe(next_df, use_container_width=True)
-                chart_df2 = next_df.rename(
-                    columns={
-                        "High (°C)": "High",
-                        "Low (°C)": "Low",
-                        "High (°F)": "High",
-                        "Low (°F)": "Low",
-                    }
-                ).set_index("Month")
-                st.line_chart(chart_df2)
-                st.download_button(
-                    label="Download next 6 CSV",
-                    data=next_df.to_csv(index=False),
-                    file_name=f"{city2.replace(' ','_')}_next6.csv",
-                    mime="text/csv",
-                )
-            else:
-                st.write("No data.")
-
-            if explain:
-                st.caption(
-                    "Outlook is a seasonal baseline (10-year monthly climatology at this location), not a deterministic forecast."
-                )
-
-            st.caption(f"Finished in {t1 - t0:0.1f}s")
+        _trend_tab(default_city, units)
 
     if st.session_state.get("history"):
         st.markdown("---")
         st.caption("Recent searches")
         hcols = st.columns(min(6, len(st.session_state["history"])))
-        for i, item in enumerate(st.session_state["history"][:6]):
+        for i, item in enumerate(st.session_state["history"]):
             label = f"{item['city']} {item['when']} ({item['units']})"
             if hcols[i].button(label, key=f"hist_btn_{i}_{label}"):
                 st.session_state["city_now"] = item["city"]
                 st.session_state["when_now"] = item["when"]
 
 
+def _trend_figure(df: pd.DataFrame, units: str):
+    # Deferred like pandas: plotly is only needed once a trend has been fetched.
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for label in ("High", "Low"):
+        col = f"{label} ({units})"
+        if col in df.columns:
+            fig.add_trace(go.Scattergl(x=df["Month"], y=df[col], mode="lines+markers", name=label))
+    # spikedistance=0 skips the nearest-point search on hover; hovermode="x" snaps to the month.
+    fig.update_layout(
+        hovermode="x",
+        spikedistance=0,
+        yaxis_title=units,
+        height=300,
+        margin=dict(l=0, r=0, t=10, b=0),
+    )
+    return fig
+
+
+@st.fragment
+def _trend_tab(default_city: str, units: str) -> None:
+    # A fragment: the trend tab's own widgets rerun just this tab, not the globe/theme above.
+    city2 = st.text_input("City", value=default_city, key="city_trend")
+    explain = st.checkbox("Explain method", value=True)
+    c_get, c_refresh = st.columns([3, 1])
+    with c_get:
+        get_trend = st.button("Get 6-month history & outlook", type="secondary")
+    with c_refresh:
+        # Trend data is monthly climatology cached for 24 h; refresh on demand instead.
+        force = st.button("Force refresh", help="Refetch the trend for this city.")
+    if get_trend or force:
+        if not city2.strip():
+            st.error("Please enter a city.")
+        else:
+            with st.spinner("Computing monthly averages…"):
+                t0 = time.time()
+                try:
+                    if force:
+                        refresh_trend(city2)
+                    trend = cached_trend(city2)
+                    t1 = time.time()
+                except Exception as e:
+                    st.error(f"Error: {e}")
+                    return
+
+        past_df = make_trend_df(trend.get("past_6", trend.get("past_6_months", [])), units)
+        next_df = make_trend_df(trend.get("next_6", trend.get("next_6_months", [])), units)
+
+        st.subheader(f"{city2}: Past 6 months (monthly averages)")
+        if not past_df.empty:
+            st.dataframe(past_df, use_container_width=True)
+            st.plotly_chart(_trend_figure(past_df, units), use_container_width=True)
+            st.download_button(
+                label="Download past 6 CSV",
+                data=_df_to_csv_bytes(past_df),
+                file_name=f"{city2.replace(' ','_')}_past6.csv",
+                mime="text/csv",
+            )
+        else:
+            st.write("No data.")
+
+        st.subheader(f"{city2}: Next 6 months (seasonal baseline)")
+        if not next_df.empty:
+            st.dataframe(next_df, use_container_width=True)
+            st.plotly_chart(_trend_figure(next_df, units), use_container_width=True)
+            st.download_button(
+                label="Download next 6 CSV",
+                data=_df_to_csv_bytes(next_df),
+                file_name=f"{city2.replace(' ','_')}_next6.csv",
+                mime="text/csv",
+            )
+        else:
+            st.write("No data.")
+
+        if explain:
+            st.caption(
+                "Outlook is a seasonal baseline (10-year monthly climatology at this location), not a deterministic forecast."
+            )
+
+        st.caption(f"Finished in {t1 - t0:0.1f}s")
+
+
 def _apply_weather_theme(code: int) -> None:
     theme = _theme_for_code(code)
     bg = theme["bg"]
@@ -312,23 +422,29 @@ def _apply_weather_theme(code: int) -> None:
     )
 
 
+_DEFAULT_THEME = {"bg": "linear-gradient(135deg,#1f2937,#374151)", "accent": "#10b981"}
+_THEME_GROUPS = (
+    ((0,), {"bg": "linear-gradient(135deg,#87CEEB,#FFE082)", "accent": "#f39c12"}),
+    ((1, 2, 3), {"bg": "linear-gradient(135deg,#cfd8dc,#90a4ae)", "accent": "#607d8b"}),
+    ((45, 48), {"bg": "linear-gradient(135deg,#b0bec5,#eceff1)", "accent": "#78909c"}),
+    (
+        (51, 53, 55, 56, 57, 61, 63, 65, 66, 67, 80, 81, 82),
+        {"bg": "linear-gradient(135deg,#0a2740,#27496d)", "accent": "#3498db"},
+    ),
+    ((71, 73, 75, 77, 85, 86), {"bg": "linear-gradient(135deg,#e0f7fa,#80deea)", "accent": "#00acc1"}),
+    ((95, 96, 99), {"bg": "linear-gradient(135deg,#2c3e50,#4b0082)", "accent": "#8e44ad"}),
+)
+_THEME_BY_CODE = {code: theme for codes, theme in _THEME_GROUPS for code in codes}
+
+
 def _theme_for_code(code: int) -> dict:
-    if code == 0:
-        return {"bg": "linear-gradient(135deg,#87CEEB,#FFE082)", "accent": "#f39c12"}
-    if code in (1, 2, 3):
-        return {"bg": "linear-gradient(135deg,#cfd8dc,#90a4ae)", "accent": "#607d8b"}
-    if code in (45, 48):
-        return {"bg": "linear-gradient(135deg,#b0bec5,#eceff1)", "accent": "#78909c"}
-    if code in (51, 53, 55, 56, 57, 61, 63, 65, 66, 67, 80, 81, 82):
-        return {"bg": "linear-gradient(135deg,#0a2740,#27496d)", "accent": "#3498db"}
-    if code in (71, 73, 75, 77, 85, 86):
-        return {"bg": "linear-gradient(135deg,#e0f7fa,#80deea)", "accent": "#00acc1"}
-    if code in (95, 96, 99):
-        return {"bg": "linear-gradient(135deg,#2c3e50,#4b0082)", "accent": "#8e44ad"}
-    return {"bg": "linear-gradient(135deg,#1f2937,#374151)", "accent": "#10b981"}
-
-
-def _build_globe(lat: float, lon: float, label: str, size: int) -> go.Figure:
+    return _THEME_BY_CODE.get(code, _DEFAULT_THEME)
+
+
+def _build_globe(lat: float, lon: float, label: str, size: int):
+    # Deferred: plotly is only needed for the no-token fallback.
+    import plotly.graph_objects as go
+
     fig = go.Figure()
     fig.add_trace(
         go.Scattergeo(
@@ -361,9 +477,18 @@ def _build_globe(lat: float, lon: float, label: str, size: int) -> go.Figure:
     return fig
 
 
-def _render_globe_mapbox(token: str, lat: float, lon: float, city: str) -> None:
-    token_js = token.replace("\\", "\\\\").replace("'", "\\'")
-    city_js = city.replace("\\", "\\\\").replace("'", "\\'")
+@st.cache_data(ttl=3600, show_spinner=False)
+def _globe_figure(lat: float, lon: float, label: str, size: int) -> dict:
+    # Cached as a plain dict (pickles cleanly); st.plotly_chart accepts it directly.
+    return _build_globe(lat, lon, label, size).to_dict()
+
+
+def _render_globe_mapbox(token: str, lat: float, lon: float, city: str, high_quality: bool = False) -> None:
+    # Spin on the light vector style; swap to satellite rasters only once the fly-in settles.
+    upgrade_js = "true" if high_quality else "false"
+    # json.dumps yields valid JS string literals; the city is also HTML-escaped for setHTML.
+    token_js = json.dumps(token)
+    city_js = json.dumps(html_lib.escape(city))
     html = f"""
     <html>
     <head>
@@ -382,46 +507,74 @@ def _render_globe_mapbox(token: str, lat: float, lon: float, city: str) -> None:
     <body>
       <div id='map'></div>
       <script>
-        mapboxgl.accessToken = '{token_js}';
-        const map = new mapboxgl.Map({{
-          container: 'map',
-          style: 'mapbox://styles/mapbox/satellite-v9',
-          projection: 'globe',
-          center: [0, 20],
-          zoom: 1.2,
-          pitch: 0,
-          bearing: 0,
-          attributionControl: false
-        }});
-        map.on('style.load', () => {{ map.setFog({{}}); }});
-
-        let start;
-        function rotate(ts) {{
-          if (!start) start = ts;
-          const elapsed = ts - start;
-          const rotation = (elapsed / 50.0) % 360.0;
-          map.setBearing(rotation);
-          if (elapsed < 4000) {{
-            requestAnimationFrame(rotate);
-          }} else {{
-            const city = [{lon}, {lat}];
-            new mapboxgl.Marker({{ color: '#e74c3c' }}).setLngLat(city).addTo(map);
-            new mapboxgl.Popup({{ closeButton: false, closeOnClick: false }})
-              .setLngLat(city)
-              .setHTML('<div class=\'marker-label\'>{city_js}</div>')
-              .addTo(map);
-            map.flyTo({{
-              center: city,
-              zoom: 5.2,
-              pitch: 45,
-              bearing: rotation,
-              speed: 0.6,
-              curve: 1.42,
-              essential: true
-            }});
+        mapboxgl.accessToken = {token_js};
+        const city = [{lon}, {lat}];
+        let map = null;
+
+        function createMap() {{
+          const m = new mapboxgl.Map({{
+            container: 'map',
+            style: 'mapbox://styles/mapbox/light-v11',
+            projection: 'globe',
+            center: [0, 20],
+            zoom: 0.9,
+            pitch: 0,
+            bearing: 0,
+            attributionControl: false,
+            antialias: false,
+            preserveDrawingBuffer: false,
+            fadeDuration: 0,
+            maxTileCacheSize: 50,
+            renderWorldCopies: false
+          }});
+          m.on('style.load', () => {{ m.setFog({{}}); }});
+
+          let start;
+          function rotate(ts) {{
+            if (map !== m) return;  // removed while animating
+            if (!start) start = ts;
+            const elapsed = ts - start;
+            const rotation = (elapsed / 50.0) % 360.0;
+            m.setBearing(rotation);
+            if (elapsed < 4000) {{
+              // ~30 fps is plenty for the intro spin and halves GPU work.
+              setTimeout(() => requestAnimationFrame(rotate), 33);
+            }} else {{
+              new mapboxgl.Marker({{ color: '#e74c3c' }}).setLngLat(city).addTo(m);
+              new mapboxgl.Popup({{ closeButton: false, closeOnClick: false }})
+                .setLngLat(city)
+                .setHTML('<div class="marker-label">' + {city_js} + '</div>')
+                .addTo(m);
+              m.flyTo({{
+                center: city,
+                zoom: 5.2,
+                pitch: 45,
+                bearing: rotation,
+                speed: 0.6,
+                curve: 1.42,
+                essential: true
+              }});
+              if ({upgrade_js}) {{
+                m.once('moveend', () => m.setStyle('mapbox://styles/mapbox/satellite-v9'));
+              }}
+            }}
           }}
+          requestAnimationFrame(rotate);
+          return m;
         }}
-        requestAnimationFrame(rotate);
+
+        // Tear the WebGL map down while it is scrolled out of view; rebuild it on return.
+        const io = new IntersectionObserver((entries) => {{
+          for (const e of entries) {{
+            if (!e.isIntersecting && map) {{
+              map.remove();
+              map = null;
+            }} else if (e.isIntersecting && !map) {{
+              map = createMap();
+            }}
+          }}
+        }});
+        io.observe(document.getElementById('map'));
       </script>
     </body>
     </html>
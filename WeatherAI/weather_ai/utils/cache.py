@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+import diskcache
+
+# Under the home directory so entries survive restarts regardless of the launch directory.
+CACHE_DIR = os.getenv(
+    "WEATHER_AI_CACHE_DIR", os.path.expanduser(os.path.join("~", ".weatherai", "cache"))
+)
+
+# TTLs (seconds) per upstream data class.
+FORECAST_TTL = 60 * 60
+# Monthly climatology only moves at month boundaries; the UI offers a manual refresh.
+TREND_TTL = 24 * 60 * 60
+GEOCODE_TTL = 7 * 24 * 60 * 60
+CLIMATOLOGY_TTL = 7 * 24 * 60 * 60
+# Short TTLs for "not found"/"no data" so typos and outages don't trigger retry storms.
+GEOCODE_MISS_TTL = 60 * 60
+ARCHIVE_MISS_TTL = 10 * 60
+
+NEGATIVE = ("__MISS__",)
+
+_MISS = object()
+_cache: Optional[diskcache.Cache] = None
+
+
+def _get_cache() -> diskcache.Cache:
+    global _cache
+    if _cache is None:
+        _cache = diskcache.Cache(CACHE_DIR)
+    return _cache
+
+
+def normalize_city(city: str) -> str:
+    return " ".join((city or "").strip().lower().split())
+
+
+def cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    raw = json.dumps(params, sort_keys=True).encode("utf-8")
+    return f"{namespace}:{hashlib.blake2b(raw, digest_size=16).hexdigest()}"
+
+
+def cache_get(namespace: str, params: Dict[str, Any], default: Any = None) -> Any:
+    return _get_cache().get(cache_key(namespace, params), default=default)
+
+
+def cache_set(namespace: str, params: Dict[str, Any], value: Any, ttl: int) -> None:
+    _get_cache().set(cache_key(namespace, params), value, expire=ttl)
+
+
+def cache_delete(namespace: str, params: Dict[str, Any]) -> None:
+    _get_cache().delete(cache_key(namespace, params))
+
+
+def get_or_fetch(namespace: str, params: Dict[str, Any], ttl: int, fetch: Callable[[], Any]) -> Any:
+    """Return the disk-cached value for (namespace, params), calling fetch() on a miss."""
+    value = cache_get(namespace, params, default=_MISS)
+    if value is not _MISS:
+        return value
+    value = fetch()
+    if not (isinstance(value, dict) and "error" in value):
+        cache_set(namespace, params, value, ttl)
+    return value
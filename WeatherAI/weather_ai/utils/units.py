@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+_F_PER_C = 9.0 / 5.0
 
 
 def c_to_f(c: float) -> float:
@@ -22,20 +28,21 @@ def format_quick_weather_text(payload: dict, units: str) -> str:
 
 
 def make_trend_df(items: list[dict], units_label: str) -> pd.DataFrame:
+    # Imported lazily: only the trend tab needs pandas, and it is slow to import.
+    import pandas as pd
+
     if not items:
         return pd.DataFrame()
     df = pd.DataFrame(items)
-    if units_label == "°F":
-        if "t_max_c" in df.columns:
-            df["t_max_f"] = df["t_max_c"].apply(c_to_f)
-        if "t_min_c" in df.columns:
-            df["t_min_f"] = df["t_min_c"].apply(c_to_f)
-        keep = [c for c in ["month", "t_max_f", "t_min_f"] if c in df.columns]
-        df = df[keep]
-        rename = {"month": "Month", "t_max_f": "High (°F)", "t_min_f": "Low (°F)"}
-    else:
-        keep = [c for c in ["month", "t_max_c", "t_min_c"] if c in df.columns]
-        df = df[keep]
-        rename = {"month": "Month", "t_max_c": "High (°C)", "t_min_c": "Low (°C)"}
-    df = df.rename(columns=rename)
-    return df
+    cols = set(df.columns)
+    fahrenheit = units_label == "°F"
+    suffix = "(°F)" if fahrenheit else "(°C)"
+    # Build the display frame in one shot instead of add-columns/select/rename passes.
+    out = {}
+    if "month" in cols:
+        out["Month"] = df["month"].to_numpy()
+    for src, label in (("t_max_c", "High"), ("t_min_c", "Low")):
+        if src in cols:
+            values = df[src].to_numpy()
+            out[f"{label} {suffix}"] = values * _F_PER_C + 32.0 if fahrenheit else values
+    return pd.DataFrame(out)